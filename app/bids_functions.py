@@ -1,15 +1,25 @@
 # coding: utf-8
 import re
 import logging
+from time import monotonic
 from tqdm import tqdm
 from functions import limit_string
+from functions import bubble_url
 from functions import extract_dates
 from functions import devtracker_sleep
+from functions import pace
+from functions import wait_for
+from functions import extract_page_fields
+from functions import set_request_filter
+from functions import record_page_load
+from functions_metrics import page_loads
+from functions_metrics import page_load_seconds
+from page_selectors import bid_page_fields
+from page_selectors import bid_page_required
+from import_secrets import *
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
-from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import WebDriverException
 from selenium.common.exceptions import InvalidSessionIdException
 from selenium.webdriver.support import expected_conditions as EC
@@ -18,9 +28,33 @@ from selenium.webdriver.support import expected_conditions as EC
 sel_timeout = 20
 
 
-def get_io_bids(driver, page_limit):
+def get_container_rfp_ids(driver, job_containers):
+    """
+    Reads the rfp_id of every bid container on the page from its bid link, in one round trip.
+
+    Args:
+        driver (webdriver): selenium webdriver object
+        job_containers (list): Bid container elements
+
+    Returns:
+        list: rfp_id per container, "" when the container has no bid link
+    """
+    bid_links = driver.execute_script(
+        "return arguments[0].map(function (container) {"
+        "  var link = container.querySelector(\"a[href*='rfp=']\");"
+        "  return link ? link.href : '';"
+        "});",
+        job_containers,
+    )
+    return [str(bid_link.split("=")[-1]) if bid_link else "" for bid_link in bid_links]
+
+
+def get_io_bids(driver, page_limit, known_rfp_ids=None):
     """Gets All Bids from Bubbleio bids page and store them in dataframe
 
+    Bids whose rfp_id is in `known_rfp_ids` are skipped without being opened, and
+    paging stops at the first page where every bid is already known.
+
     Args:
         driver (webdriver): selenium webdriver object
 
@@ -28,18 +62,22 @@ def get_io_bids(driver, page_limit):
         data[]: returns list of all scrapped bids
         :param driver:
         :param page_limit:
+        :param known_rfp_ids: set of rfp_ids already in the Bids sheet
     """
+    known_rfp_ids = (known_rfp_ids or set()) - {""}
     logging.info(f"[Bids]: Opening Bid Page")
     # Open App
     retry_count = 0
     pages_scrapped = 0
-    bids_url = f"https://bubble.io/agency-requests/sent"
+    bids_url = bubble_url + "agency-requests/sent"
+    set_request_filter(driver, "bids")
+    pace("bubble", site="get_io_bids")
     driver.get(bids_url)
     # check for total Bids
     bids_count_path = "//*[@class='bubble-element Text cnaBaJp3']"
     total_bids_count = driver.find_element(By.XPATH, bids_count_path).text
+    record_page_load(driver, "bids")
     logging.info(f"[Bids]: Total Request: {total_bids_count}")
-    devtracker_sleep(10, 15)
 
     # Get Bids
     job_boxes_all_path = "//div[contains(@class, 'cnaBaJv3')]"
@@ -52,20 +90,31 @@ def get_io_bids(driver, page_limit):
                 break
 
             logging.info(f'[Bids]: ==========Get Page {pages_scrapped + 1}/{page_limit}===========')
-            WebDriverWait(driver, sel_timeout).until(EC.visibility_of_element_located((By.XPATH, job_boxes_all_path)))
+            wait_for(driver, EC.visibility_of_element_located((By.XPATH, job_boxes_all_path)),
+                     site="get_io_bids")
             job_containers = driver.find_elements(By.XPATH, job_boxes_all_path)
 
             logging.info(f"[Bids]: Number of Bids on Current Page: {len(job_containers)}")
+            container_rfp_ids = get_container_rfp_ids(driver, job_containers)
+            known_on_page = sum(1 for rfp_id in container_rfp_ids if rfp_id in known_rfp_ids)
+            logging.info(f"[Bids]: Already Known Bids on Current Page: {known_on_page}")
+            if job_containers and known_on_page == len(job_containers):
+                logging.info("[Bids]: Every Bid on this page is known, Stopping!")
+                break
+
             for job_index in tqdm(range(len(job_containers))):
+                if container_rfp_ids[job_index] in known_rfp_ids:
+                    continue
                 current_job_path = job_box_ind_path.format(str(job_index + 1))
                 job_details = get_bid(current_job_path, driver)
                 job_list.append(job_details)
                 logging.info(f"[Requests]: Current App Name: {job_details[1]} | RFP_ID: {job_details[0]}")
-                devtracker_sleep(2, 4)
 
             # Paginate by finding forward arrow icon
             forward_btn = driver.find_element(By.XPATH, "//button[text()='arrow_forward']")
-            bids_pagination = driver.find_element(By.XPATH, "//div[contains(@class, 'cnaBaLaA3')]")
+            bids_pagination_path = "//div[contains(@class, 'cnaBaLaA3')]"
+            bids_pagination = driver.find_element(By.XPATH, bids_pagination_path)
+            current_page_text = bids_pagination.text
 
             # If no limit applied go till the last page
             if bids_pagination:
@@ -74,8 +123,11 @@ def get_io_bids(driver, page_limit):
                 if not forward_btn or int(bids_pagination[0]) == int(bids_pagination[-1]):
                     break
 
+            pace("bubble", site="get_io_bids")
             driver.execute_script("arguments[0].click();", forward_btn)
-            devtracker_sleep(4, 6)
+            # The next page is shown once the page counter changes
+            wait_for(driver, lambda _driver: _driver.find_element(By.XPATH, bids_pagination_path).text
+                     != current_page_text, site="get_io_bids")
             pages_scrapped += 1
 
         except TimeoutException:
@@ -84,15 +136,31 @@ def get_io_bids(driver, page_limit):
             if retry_count > 3:
                 break
             retry_count = retry_count + 1
-            devtracker_sleep(5, 10)
+            devtracker_sleep(5, 10, site="get_io_bids")
         except InvalidSessionIdException:
             logging.critical("[Bids]: Browser Crashed, retrying!")
-            devtracker_sleep(1, 2)
+            devtracker_sleep(1, 2, site="get_io_bids")
             raise Exception
 
     return job_list
 
 
+# Sequences of uppercase words separated by abnormal spacing and '|', e.g. "MATT GRAHAM  |  RAPID DEV"
+rep_signature_pattern = re.compile(r'\b([A-Z]+(?:\s+[A-Z]+)*\s*\|\s*[A-Z]+(?:\s+[A-Z]+)*)\b', re.MULTILINE)
+# Every name of the rep directory in one alternation, longest first so a full name wins over a prefix,
+# as whole words so a name isn't found inside another word
+rep_directory_pattern = re.compile(
+    r"\b(?:" + "|".join(re.escape(name) for name in sorted(rep_directory, key=len, reverse=True)) + r")\b"
+    if rep_directory else r"(?!)"
+)
+# Non-empty lines at the end of a response that make up its signature block
+rep_signature_lines = 3
+# Signature of the bids sent from the contributor profile instead of a rep
+rep_profile_label = "Rapid Dev Contributor Profile"
+# How the rep of each bid was found: {"signature" | "directory" | "page": count}
+rep_match_stats = {"signature": 0, "directory": 0, "page": 0}
+
+
 def get_rep_name_regex(text):
     """
     Finds sequences of uppercase words separated by abnormal spacing and '|'.
@@ -103,78 +171,94 @@ def get_rep_name_regex(text):
     Returns:
     - list: Matched sequences.
     """
-    # Regex pattern for finding sequences of uppercase words separated by abnormal spacing and '|'
-    pattern_abnormal_spacing = r'\b([A-Z]+(?:\s+[A-Z]+)*\s*\|\s*[A-Z]+(?:\s+[A-Z]+)*)\b'
-    matches = re.findall(pattern_abnormal_spacing, text, re.MULTILINE)
-    return matches
+    return rep_signature_pattern.findall(text)
 
 
-def has_matches(input_string, string_list):
+def match_rep_directory(text):
     """
-    Check if any element in the list 'string_list' is a substring of the string 'input_string'.
+    Finds the last rep of the directory named in the signature block of a text (its last
+    `rep_signature_lines` non-empty lines), so a name quoted in the body isn't taken for the signature.
 
-    Args:
-        input_string (str): The input string to check for matches.
-        string_list (list): The list of strings to check for as substrings.
+    Parameters:
+    - text (str): Input text.
 
     Returns:
-        bool: True if any substring is found, False otherwise.
+    - str: The rep's name as written in the directory, None if no rep is named.
     """
-    return any(substring in input_string for substring in string_list)
+    lines = [line for line in text.splitlines() if line.strip()]
+    matches = rep_directory_pattern.findall("\n".join(lines[-rep_signature_lines:]))
+    return matches[-1] if matches else None
 
 
-def get_rep_name_sel(driver):
+def get_rep_name_sel(driver, fields=None):
     """
     Retrieves the representative's name from a web page using Selenium WebDriver.
 
     Parameters:
     - driver: The Selenium WebDriver instance.
+    - fields (dict): Fields already read by extract_page_fields, saves the round trip.
 
     Returns:
     - str: The representative's name.
 
     If the name cannot be found, the function returns "Not Signed | Needs Attention".
     """
-    try:
-        rep_path = "(//div[contains(@class, 'cnaBaWc8')]//u)[last()]"
-        rep_name = driver.find_element(By.XPATH, rep_path).text.split("|")[0].strip()
-
-        # List of expected responses
-        expected_responses = ['Rapid Dev Contributor Profile', 'Andrew Woodard', 'FINN KACZMAROWSKI', 'HAILEY HUSFELT',
-                              'MATT GRAHAM', 'ANDREW WOODARD', 'BAZ FILMER', 'JOHN GEMMA', 'JACOB KAPLAN', 'MATT POLIO']
-
-        if not has_matches(rep_name, expected_responses):
-            rep_path_2 = "(//div[contains(@class, 'cnaBaWc8')]//*[contains(text(), 'Rapid Dev Contributor Profile | Bubble')])"
-            rep_name = driver.find_element(By.XPATH, rep_path_2).text.split("|")[0].strip()
-    except NoSuchElementException:
-        rep_name = "Not Signed | Needs Attention"
+    if fields is None:
+        rep_fields = {field: bid_page_fields[field] for field in ("rep", "rep_profile")}
+        fields, _ = extract_page_fields(driver, rep_fields)
+
+    if "rep" not in fields:
+        return "Not Signed | Needs Attention"
+    rep_name = fields["rep"].split("|")[0].strip()
+    if not (rep_directory_pattern.search(rep_name) or rep_profile_label in rep_name):
+        if "rep_profile" not in fields:
+            return "Not Signed | Needs Attention"
+        rep_name = fields["rep_profile"].split("|")[0].strip()
 
     return rep_name
 
 
-def get_rep_name(driver, resp_txt):
+def get_rep_name(driver, resp_txt, fields=None):
     """
     Extracts the representative's name from response text or fetches it from Selenium WebDriver.
 
     Parameters:
     - driver: The Selenium WebDriver instance.
     - resp_txt (str): Response text containing potential representative information.
+    - fields (dict): Fields of the bid page already read by extract_page_fields.
 
     Returns:
     - str: The representative's name.
 
-    If the name is found in the response text, it is extracted and returned.
-    Otherwise, the name is obtained using the provided Selenium WebDriver instance.
+    The name is looked for in the response text, first as an uppercase signature,
+    then as a name of the rep directory (REP_DIRECTORY). Only otherwise is it read
+    from the page elements. rep_match_stats counts how often each way is used.
     """
     rep_matches = get_rep_name_regex(resp_txt)
 
     if rep_matches:
         # Extract the first match and strip any leading/trailing spaces or '|'
         rep_name = rep_matches[0].strip().split("|")[0].strip()
-    else:
-        rep_name = get_rep_name_sel(driver)
+        rep_match_stats["signature"] += 1
+        return rep_name
 
-    return rep_name
+    rep_name = match_rep_directory(resp_txt)
+    if rep_name:
+        rep_match_stats["directory"] += 1
+        return rep_name
+
+    rep_match_stats["page"] += 1
+    return get_rep_name_sel(driver, fields)
+
+
+def rep_match_report(log_prefix):
+    """
+    Log how the reps were found since the start of the process.
+    """
+    total = sum(rep_match_stats.values())
+    if total:
+        logging.info(f"{log_prefix}: [Reps] " + " | ".join(
+            f"{source}: {count} ({count / total:.0%})" for source, count in rep_match_stats.items()))
 
 
 def get_bid(job_elem, driver):
@@ -188,61 +272,61 @@ def get_bid(job_elem, driver):
         bid[]: bid array
     """
     # Open Job
+    window_count = len(driver.window_handles)
+    pace("bubble", site="get_bid")
+    load_start = monotonic()
     while True:
         try:
             driver.find_element(By.XPATH, job_elem).click()
             break
         except InvalidSessionIdException:
             logging.critical("[Bids]: Browser Crashed due to Invalid Session ID, retrying!")
-            devtracker_sleep(1, 2)
+            devtracker_sleep(1, 2, site="get_bid")
             raise Exception
         except WebDriverException:
             logging.critical("[Bids]: Browser Crashed due to Web Driver Exception, retrying!")
-            devtracker_sleep(1, 2)
+            devtracker_sleep(1, 2, site="get_bid")
             raise Exception
         except Exception as e:
             logging.critical("[Bids]: Exception while trying to click, retrying!")
             logging.critical(f"[Bids]: Error Message {e}")
-            devtracker_sleep(1, 2)
+            devtracker_sleep(1, 2, site="get_bid")
             continue
-    devtracker_sleep(2, 4)
 
     # Switch to new Tab as clicking on a bid will open it in a new tab
-    driver.switch_to.window(driver.window_handles[-1])
-    devtracker_sleep(2, 4)
-
-    # Check if the Bid is opened & Get Data
-    # Extract Name
-    name_path = "//*[contains(@class, 'cnaBaVaB8')]"
-    WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.XPATH, name_path)))
-    devtracker_sleep(2, 4)
-    name = str(driver.find_element(By.XPATH, name_path).text).strip()
+    try:
+        wait_for(driver, EC.number_of_windows_to_be(window_count + 1), timeout=10, site="get_bid")
+        driver.switch_to.window(driver.window_handles[-1])
+
+        # Check if the Bid is opened & Get Data
+        name_path = bid_page_fields["name"]
+        wait_for(driver, EC.visibility_of_element_located((By.XPATH, name_path)), timeout=10, site="get_bid")
+    except TimeoutException:
+        page_loads.inc(page="bid", outcome="timeout")
+        raise
+    page_load_seconds.observe(monotonic() - load_start, page="bid")
+    page_loads.inc(page="bid", outcome="ok")
+    # Extract every field in one round trip
+    fields, _ = extract_page_fields(driver, bid_page_fields, required=bid_page_required)
+    name = fields["name"]
 
     # Extract Response Date
-    response_date_path = "//div[contains(@class, 'cnaBaVy8')]"
-    response_date = driver.find_element(By.XPATH, response_date_path).text
-    response_date = extract_dates(response_date)
+    response_date = extract_dates(fields["response_date"])
 
     # Extract Response
     response_char_limit = 50000
-    response_path = "//div[contains(@class, 'cnaBaWc8')]"
-    response_text = driver.find_element(By.XPATH, response_path).text
+    response_text = fields["response"]
     # Updating Response for Google Sheets' 50000 Char Limit per Cell
     gs_resp = limit_string(input_string=response_text, max_chars=response_char_limit)
 
     # Extract Rep
-    rep_name = get_rep_name(driver, response_text)
+    rep_name = get_rep_name(driver, response_text, fields)
 
     # Extract Rep calendly
-    try:
-        rep_calendly_path = "//a[contains(@href, 'calendly.com')]"
-        rep_calendly_link = driver.find_element(By.XPATH, rep_calendly_path)
-        rep_calendly_link = rep_calendly_link.get_attribute("href")
-    except NoSuchElementException:
-        rep_calendly_link = "Calendly Link Not Included | Needs Attention"
+    rep_calendly_link = fields.get("calendly_href") or "Calendly Link Not Included | Needs Attention"
 
     # Extract Current URL
-    bid_url = driver.current_url
+    bid_url = fields["current_url"]
 
     # Extract the Rfp_id
     rfp_id = str(bid_url.split("=")[-1])
@@ -252,5 +336,4 @@ def get_bid(job_elem, driver):
 
     # Switch Back
     driver.switch_to.window(driver.window_handles[0])
-    devtracker_sleep(2, 4)
     return [rfp_id, name, response_date, gs_resp, bid_url, rep_name, rep_calendly_link]
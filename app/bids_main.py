@@ -1,90 +1,116 @@
 # coding: utf-8
 import logging
-
-import pandas as pd
+from time import monotonic
 
 from bids_functions import get_io_bids
+from bids_functions import rep_match_report
+from functions import pacing_report
+from functions import page_load_report
+from functions import DriverPool
+from functions import BubbleLoginError
 from functions import bubbleio_login
-from functions import devtracker_sleep
-from functions import diff_df_by_column
-from functions import get_driver
 from functions import gs_get_data
 from functions import gs_insert_data
+from functions import gs_write_buffer
+from functions import column_index_to_alphabet
 from functions import open_worksheet
-from functions_slack import slack_notification
+from functions_supervisor import Supervisor
+from functions_store import store_sync
+from functions_store import store_content_index
+from functions_store import content_hash
 from import_secrets import *
 
 
-def bids_main_script():
-    logging.info("[Bids]: Starting Bubbleio Dev Monitor Tool")
-    slack_notification(channel=alerts_channel_name, msg_text=":outbox_tray: RFP Bids Script Started!  :rocket:")
-    # Setting the number of pages from which script can get bids
-    page_limit = 1
+# Setting the number of pages from which script can get bids
+page_limit = 1
+bids_sheet_cols = ['rfp_id', 'name', 'response_date', 'response', 'bid_url', 'rep_name', 'rep_calendly_link']
+# Stamped with the scrape time by extract_dates, so a known bid keeps the date already in the sheet
+response_date_col = bids_sheet_cols.index('response_date')
+# monotonic() of the last scan that reopened the known bids
+bids_scan_state = {"last_rescan": monotonic()}
+
+
+def bids_main_iteration(driver):
+    """
+    One pass of the Bids tracker: scrape the Sent bids page with a logged-in driver,
+    append the new bids and rewrite the edited ones in the Bids sheet.
+    """
+    # Get Existing Data
+    sh = open_worksheet(bid_sheet_name)
+    logging.info(f"[Bids]: Getting Bids, Page Limit: {page_limit}")
+    bids_sh_data = gs_get_data(sh, delta=True)
+    store_sync(bid_sheet_name, bids_sh_data, columns=bids_sheet_cols)
+    bids_index = store_content_index(bid_sheet_name, 'rfp_id')
+    logging.info(f"[Bids]: Existing Records: {str(len(bids_index))}")
+
+    # Get New & Edited Data: known bids are reopened only on a periodic rescan
+    rescan = monotonic() - bids_scan_state["last_rescan"] >= bids_rescan_interval
+    if rescan:
+        logging.info("[Bids]: Rescanning known Bids for edits")
+        bids_scan_state["last_rescan"] = monotonic()
+    bids = get_io_bids(driver, page_limit, None if rescan else set(bids_index))
+
+    # Compare each bid with the row already in the sheet by its content hash
+    new_bids, changed_bids = {}, {}
+    for bid in bids:
+        bid = ["" if value is None else value for value in bid]
+        rfp_id = str(bid[0])
+        if rfp_id in new_bids or rfp_id in changed_bids:
+            continue
+        if rfp_id not in bids_index:
+            new_bids[rfp_id] = bid
+            continue
+        _row_num, row_hash, stored_bid = bids_index[rfp_id]
+        if len(stored_bid) > response_date_col and stored_bid[response_date_col]:
+            bid[response_date_col] = stored_bid[response_date_col]
+        if row_hash != content_hash(bid, len(bids_sheet_cols)):
+            changed_bids[rfp_id] = bid
+    logging.info(f"[Bids]: New Bids: {len(new_bids)} | Edited Bids: {len(changed_bids)} | "
+                 f"Unchanged Bids: {len(bids) - len(new_bids) - len(changed_bids)}")
+
+    if changed_bids:
+        last_col_letter = column_index_to_alphabet(len(bids_sheet_cols))
+        gs_buffer = gs_write_buffer(sh, "Bids")
+        for rfp_id, bid in changed_bids.items():
+            row_num = bids_index[rfp_id][0]
+            gs_buffer.update(f"A{row_num}:{last_col_letter}{row_num}", [bid])
+        gs_buffer.flush()
+    if new_bids:
+        gs_insert_data(sh, list(new_bids.values()), "Bids")
+    if not new_bids and not changed_bids:
+        logging.warning("[Bids]: No new or edited records found, Skipping...")
+    pacing_report("[Bids]")
+    page_load_report("[Bids]")
+    rep_match_report("[Bids]")
 
+
+def bids_session_iteration(_item, driver):
+    """
+    bids_main_iteration on a pool session, logged in again first if Bubble dropped its session.
+    The iteration is skipped if bubbleio_login fails.
+    """
+    if not bubbleio_login(driver):
+        logging.error("[Bids]: Unable to log in to Bubble, Skipping...")
+        return
+    bids_main_iteration(driver)
+
+
+def bids_pool_iteration(driver_pool):
+    """
+    bids_main_iteration on a session of the driver pool, replaced if the browser crashed.
+    A new session that couldn't log in skips the iteration like a pool session does.
+    """
     try:
-        # Check Login & Get apps to track
-        driver = get_driver()
-        is_logged_in = bubbleio_login(driver)
-
-        if is_logged_in:
-            while True:
-                try:
-                    # Get Existing Data
-                    sh = open_worksheet(bid_sheet_name)
-                    logging.info(f"[Bids]: Getting Bids, Page Limit: {page_limit}")
-                    bids_sh_data = gs_get_data(sh)
-                    logging.info(f"[Bids]: Existing Records: {str(len(bids_sh_data))}")
-                    bids_sheet_cols = ['rfp_id', 'name', 'response_date', 'response', 'bid_url', 'rep_name',
-                                       'rep_calendly_link']
-                    if len(bids_sh_data) > 0:
-                        existing_bids_df = pd.DataFrame(bids_sh_data, columns=bids_sheet_cols)
-                    else:
-                        existing_bids_df = pd.DataFrame([], columns=bids_sheet_cols)
-
-                    # Get New Data
-                    bids = get_io_bids(driver, page_limit)
-                    if len(bids) > 0:
-                        ext_bids_df = pd.DataFrame(bids, columns=bids_sheet_cols)
-                    else:
-                        ext_bids_df = pd.DataFrame([], columns=bids_sheet_cols)
-
-                    # Check if there are new records
-                    diff_df = diff_df_by_column(df_new=ext_bids_df,
-                                                df_old=existing_bids_df,
-                                                column_name='rfp_id',
-                                                duplicate_criteria=['rfp_id', 'name', 'response', 'bid_url', 'rep_name',
-                                                                    'rep_calendly_link'])
-                    new_rec_count = str(diff_df.shape[0])
-                    logging.info(f"[Bids]: New Unique records found: {new_rec_count}")
-                    if diff_df.shape[0]:
-                        diff_df_final = diff_df.fillna("")
-                        gs_insert_data(sh, diff_df_final.values.tolist(), "Bids")
-                    else:
-                        logging.warning("[Bids]: No new records found, Skipping...")
-                    devtracker_sleep(10, 15)
-
-                except Exception as e:
-                    logging.info(f"[Bids]: RFP Bids Tracker is down: {e}")
-                    slack_notification(channel=alerts_channel_name,
-                                       msg_text=":outbox_tray: :x: RFP Bids Tracker is down. :x:", exception_trace=e)
-                    break
-
-        # Quiting Driver & Restarting
-        try:
-            driver.quit()
-            logging.info(f"[Bids]: Closing Driver")
-        except Exception as e:
-            logging.warning(f"[Bids]: Driver is already closed {e}")
-    except Exception as e:
-        logging.critical(f"[Bids]: RFP Bids Tracker is down: {e}")
-        slack_notification(channel=alerts_channel_name,
-                           msg_text=":outbox_tray: :x: RFP Bids Tracker is down. :x:", exception_trace=e)
-
-    # Restarting
-    devtracker_sleep(30, 60)
-    slack_notification(channel=alerts_channel_name,
-                       msg_text=":outbox_tray: :recycle: Restarting RFP Bids Tracker. :recycle:")
-    bids_main_script()
+        driver_pool.run(bids_session_iteration, None)
+    except BubbleLoginError as e:
+        logging.error(f"[Bids]: {e}, Skipping...")
+
+
+def bids_main_script():
+    # One logged-in browser session per (re)start, quit when the run ends
+    Supervisor(label=":outbox_tray: RFP Bids Tracker", log_prefix="[Bids]",
+               iteration=bids_pool_iteration, interval=bids_interval, setup=lambda: DriverPool(size=1),
+               teardown=lambda driver_pool: driver_pool.quit(), script="bids").run()
 
 
 if __name__ == '__main__':
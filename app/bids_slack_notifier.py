@@ -1,139 +1,234 @@
 # coding: utf-8
+import asyncio
 import logging
-import pandas as pd
 from tqdm import tqdm
-from datetime import datetime
 
 from import_secrets import *
-from functions import gs_update_data
+from functions import gs_write_buffer
 from functions import open_worksheet
 from functions import gs_get_data
-from functions import devtracker_sleep
-from functions import add_spreadsheet_range_column
-from functions_slack import get_elapsed_ts
+from functions import pacing_report
+from functions import prepare_leads
+from functions import lead_sheet_fields
+from functions import lead_date_format
+from functions import AsyncGSWriter
+from functions_store import store_sync
+from functions_store import store_get_df
+from functions_slack import resolve_thread_ts
 from functions_slack import slack_notification
 from functions_slack import channel_name_to_id
 from functions_slack import respond_to_slack_message
 from functions_slack import react_to_slack_message
 from functions_slack import edit_slack_message
+from functions_slack_async import AsyncSlack
+from functions_supervisor import Supervisor
 
 
-def resp_slack_notifier():
-    # Creating a dataframe from Leads Sheet
-    logging.info("[Requests Notifier]: Opening Leads Sheet")
-    sh = open_worksheet(lead_sheet_name)
-    leads_sh_data = gs_get_data(sh)
-    leads_sh_cols = leads_sh_data[0]
-    leads_df = pd.DataFrame(leads_sh_data[1:], columns=leads_sh_cols)
+thread_emojis = ["alphabet-white-s", "alphabet-white-e", "alphabet-white-n", "alphabet-white-t",
+                 "alphabet-white-exclamation"]
 
-    # Adding Cell addresses for "response_msg_status" and "response_thread_id"
-    leads_df = add_spreadsheet_range_column(leads_df, leads_sh_cols, ["response_msg_status", "response_thread_id"])
+# RFP IDs of the leads already reported for invalid dates
+invalid_date_leads = set()
 
-    # Filter Out the rows that do not have Slack threads
-    logging.info("[Requests Notifier]: Removing Leads without Slack Threads")
-    slack_threads_df = leads_df.loc[leads_df['requests_thread_id'] != '']
 
-    # Filter out only the rows that have matches
-    logging.info("[Requests Notifier]: Removing Leads without matches")
-    matched_df = slack_threads_df.loc[slack_threads_df['response'] != '#N/A']
+def report_invalid_leads(invalid_leads_df):
+    """
+    Alert about the leads prepare_leads left out for their dates, once per RFP ID and process.
+    """
+    invalid_rfp_ids = invalid_leads_df.iloc[:, lead_sheet_fields["rfp_id"]].tolist()
+    logging.error(f"[Requests Notifier]: Invalid dates for RFP IDs: {invalid_rfp_ids}")
+    unreported_rfp_ids = [rfp_id for rfp_id in invalid_rfp_ids if rfp_id not in invalid_date_leads]
+    if unreported_rfp_ids:
+        invalid_date_leads.update(unreported_rfp_ids)
+        slack_notification(
+            channel=alerts_channel_name,
+            msg_text=f":warning: [Response Notifier] Leads skipped, created/response date not in "
+                     f"{lead_date_format} format. RFP IDs: {', '.join(unreported_rfp_ids)}",
+        )
+
+
+def get_unsent_leads():
+    """
+    Sync the Leads sheet and return the leads whose response message hasn't been sent yet.
+
+    Returns:
+        tuple: (gs_buffer, leads) where each lead is a `Lead` record from prepare_leads,
+               with `req_thread_ts` already resolved to the original Slack ts ("" if expired).
+    """
+    # Creating a dataframe from Leads Sheet
+    logging.info("[Requests Notifier]: Opening Leads Sheet")
+    sh = open_worksheet(lead_sheet_name)
+    gs_buffer = gs_write_buffer(sh, "Response Notifier")
+    leads_sh_data = gs_get_data(sh, delta=True)
+    store_sync(lead_sheet_name, leads_sh_data)
 
     # Filter out the rows for which the Slack Message has already been sent.
     logging.info("[Requests Notifier]: Removing threads for which the message has already been sent.")
-    unsent_df = matched_df.loc[matched_df['response_msg_status'] != 'Y']
+    leads_df = store_get_df(lead_sheet_name, exclude={"response_msg_status": "Y"})
 
-    # Sending Messages to the unsent rows
+    # Filter Out the rows that do not have Slack threads & the rows without matches
+    logging.info("[Requests Notifier]: Removing Leads without Slack Threads or matches")
+    unsent_df = leads_df.loc[(leads_df['requests_thread_id'] != '') & (leads_df['response'] != '#N/A')]
     logging.info(f"[Requests Notifier]: Rows, Columns: {unsent_df.shape}")
-    unsent_rows = unsent_df.values.tolist()
 
+    request_channel_ids = {}
     if unsent_df.shape[0]:
-        for unsent_row_vals in tqdm(unsent_rows):
-            url = f"https://bubble.io/agency-requests/sent?rfp={unsent_row_vals[0]}"
-            budget = unsent_row_vals[4]
-            created_date = unsent_row_vals[5]
-            req_thread_ts = unsent_row_vals[7]
-            req_type = unsent_row_vals[8]
-            response_date = unsent_row_vals[9]
-            response_body = unsent_row_vals[10]
-            rep_name = unsent_row_vals[11]
-            flag_cell_address = unsent_row_vals[-2]
-            response_th_cell_address = unsent_row_vals[-1]
-
-            # Calculate Response Time
-            created_date_time = datetime.strptime(created_date, "%d/%m/%Y, %H:%M:%S")
-            response_date_time = datetime.strptime(response_date, "%d/%m/%Y, %H:%M:%S")
-            total_response_time = response_date_time - created_date_time
-
-            if req_type == "Agency Request":
-                request_channel_id = channel_name_to_id(request_channel_name)
-                req_channel_name = request_channel_name
-            else:
-                request_channel_id = channel_name_to_id(request_channel_direct)
-                req_channel_name = request_channel_direct
-
-            req_thread_ts = get_elapsed_ts(request_channel_id, req_thread_ts)
-            if req_thread_ts:
+        request_channel_ids = {channel: channel_name_to_id(channel)
+                               for channel in (request_channel_name, request_channel_direct)}
+    leads, invalid_leads_df = prepare_leads(unsent_df,
+                                            channel_routes={"Agency Request": request_channel_name},
+                                            default_channel=request_channel_direct,
+                                            channel_ids=request_channel_ids)
+    if invalid_leads_df.shape[0]:
+        report_invalid_leads(invalid_leads_df)
+
+    # Resolve the original thread timestamps with one history window per request channel
+    resolved_thread_ts = {}
+    for req_channel_name in {lead.req_channel_name for lead in leads}:
+        resolved_thread_ts[req_channel_name] = resolve_thread_ts(
+            request_channel_ids[req_channel_name],
+            [lead.req_thread_ts for lead in leads if lead.req_channel_name == req_channel_name])
+    leads = [lead._replace(req_thread_ts=resolved_thread_ts[lead.req_channel_name][lead.req_thread_ts])
+             for lead in leads]
+
+    return gs_buffer, leads
+
+
+def lead_messages(lead):
+    """
+    Craft the messages of a lead: (request thread edit, thread reply, response channel message).
+    """
+    updated_slack_message = (f"`Budget:` {lead.budget} | `Rep:` {lead.rep_name} | "
+                             f"`Response Time:` {lead.total_response_time}")
+    thread_msg_text = f"""*Response Body* : {lead.response_body}\n*Url*: {lead.url}"""
+    main_body_msg = (f"`Budget:` {lead.budget} | `Request Type:` {lead.req_type} | "
+                     f"`Rep:` {lead.rep_name} | `Response Time:` {lead.total_response_time}")
+    return updated_slack_message, thread_msg_text, main_body_msg
+
+
+def resp_slack_notifier():
+    gs_buffer, leads = get_unsent_leads()
+
+    if leads:
+        try:
+            for lead in tqdm(leads):
+                if not lead.req_thread_ts:
+                    gs_buffer.update(lead.flag_cell_address, "Expired Thread")
+                    continue
+                updated_slack_message, thread_msg_text, main_body_msg = lead_messages(lead)
+
                 # Edit Message in "rfp-leads"
-                updated_slack_message = (f"`Budget:` {budget} | `Rep:` {rep_name} | "
-                                         f"`Response Time:` {total_response_time}")
-                edit_slack_message(channel=request_channel_id,
-                                   thread_ts=req_thread_ts,
+                edit_slack_message(channel=lead.request_channel_id,
+                                   thread_ts=lead.req_thread_ts,
                                    updated_text=updated_slack_message)
 
                 # Send Message to "rfp-leads"
-                thread_msg_text = f"""*Response Body* : {response_body}\n*Url*: {url}"""
-                thread_emojis = ["alphabet-white-s", "alphabet-white-e", "alphabet-white-n", "alphabet-white-t",
-                                 "alphabet-white-exclamation"]
-                respond_to_slack_message(channel=req_channel_name,
-                                         thread_ts=req_thread_ts,
+                respond_to_slack_message(channel=lead.req_channel_name,
+                                         thread_ts=lead.req_thread_ts,
                                          text=thread_msg_text)
 
                 # React to the Message in "rfp-leads"
-                react_to_slack_message(channel_id=request_channel_id,
-                                       thread_ts=req_thread_ts,
+                react_to_slack_message(channel_id=lead.request_channel_id,
+                                       thread_ts=lead.req_thread_ts,
                                        reactions=thread_emojis)
-            else:
-                gs_update_data(sh, flag_cell_address, "Expired Thread")
-                continue
 
-            # Send Message to "rfp-response-time"
-            # Craft Message and Message Thread
-            main_body_msg = f"`Budget:` {budget} | `Request Type:` {req_type} | `Rep:` {rep_name} | `Response Time:` {total_response_time}"
-            thread_msg_text = f"""*Response Body* : {response_body}\n*Url*: {url}"""
+                # Send the Message Main Body to the Response Channel ("rfp-response-time")
+                msg_response = slack_notification(channel=response_channel_name, msg_text=main_body_msg)
+                gs_buffer.update(lead.response_th_cell_address, msg_response)
 
-            # Send the Message Main Body to the Response Channel
-            msg_response = slack_notification(channel=response_channel_name, msg_text=main_body_msg)
-            gs_update_data(sh, response_th_cell_address, msg_response)
+                # Send Message to the Response Channel
+                respond_to_slack_message(channel=response_channel_name, text=thread_msg_text, thread_ts=msg_response)
+
+                # Add a "Y" to flag that a message has been sent for this lead
+                gs_buffer.update(lead.flag_cell_address, "Y")
+        finally:
+            # Flag the processed leads even if the iteration failed
+            gs_buffer.flush()
+    else:
+        logging.info("[Requests Notifier]: No Messages to Send")
+    pacing_report("[Requests Notifier]")
+    logging.info("[Requests Notifier]: Iteration complete, Restarting...")
 
-            # Send Message to the Response Channel
-            respond_to_slack_message(channel=response_channel_name, text=thread_msg_text, thread_ts=msg_response)
 
-            # Add a "Y" to flag that a message has been sent for this lead
-            gs_update_data(sh, flag_cell_address, "Y")
-            devtracker_sleep(2, 5)
+async def notify_lead_async(lead, slack, gs_writer, semaphore):
+    """
+    Post one lead: the steps of a lead stay in order, other leads run alongside it.
+    A lead is flagged "Y" as soon as its own messages are sent, whatever happens to the others.
+    """
+    async with semaphore:
+        if not lead.req_thread_ts:
+            await gs_writer.update(lead.flag_cell_address, "Expired Thread")
+            return
+        updated_slack_message, thread_msg_text, main_body_msg = lead_messages(lead)
+
+        # Edit, Reply & React in "rfp-leads"
+        await slack.edit_message(lead.request_channel_id, lead.req_thread_ts, updated_slack_message)
+        await slack.post_message(lead.req_channel_name, thread_msg_text, thread_ts=lead.req_thread_ts)
+        await slack.react(lead.request_channel_id, lead.req_thread_ts, thread_emojis)
+
+        # Message & Reply in the Response Channel
+        msg_response = await slack.post_message(response_channel_name, main_body_msg)
+        await gs_writer.update(lead.response_th_cell_address, msg_response)
+        await slack.post_message(response_channel_name, thread_msg_text, thread_ts=msg_response)
+
+        # Add a "Y" to flag that a message has been sent for this lead
+        await gs_writer.update(lead.flag_cell_address, "Y")
+
+
+async def notify_leads_async(gs_buffer, leads):
+    """
+    Post the leads concurrently. A failed lead doesn't cancel the others: every lead runs to the end
+    and is flagged on its own, then the first error is raised once the flags are flushed.
+    """
+    gs_writer = AsyncGSWriter(gs_buffer)
+    semaphore = asyncio.Semaphore(notifier_concurrency)
+    try:
+        async with AsyncSlack() as slack:
+            results = await asyncio.gather(*[notify_lead_async(lead, slack, gs_writer, semaphore)
+                                             for lead in leads], return_exceptions=True)
+    finally:
+        # Flag the processed leads even if the iteration failed
+        await gs_writer.flush()
+    errors = [(lead, result) for lead, result in zip(leads, results) if isinstance(result, Exception)]
+    for lead, error in errors:
+        logging.error(f"[Requests Notifier]: Lead {lead.url} failed: {error!r}")
+    if errors:
+        raise errors[0][1]
+
+
+def resp_slack_notifier_async():
+    """
+    asyncio version of resp_slack_notifier: up to NOTIFIER_CONCURRENCY leads are in flight at once.
+
+    Slack's budgets still apply (see AsyncSlack), so concurrency overlaps the latency of the calls
+    rather than raising the rate of a method.
+    """
+    gs_buffer, leads = get_unsent_leads()
+
+    if leads:
+        logging.info(f"[Requests Notifier]: Notifying {len(leads)} Leads, "
+                     f"Concurrency: {notifier_concurrency}")
+        asyncio.run(notify_leads_async(gs_buffer, leads))
     else:
         logging.info("[Requests Notifier]: No Messages to Send")
+    pacing_report("[Requests Notifier]")
     logging.info("[Requests Notifier]: Iteration complete, Restarting...")
-    devtracker_sleep(5, 10)
+
+
+def run_resp_slack_notifier():
+    """
+    One iteration of the notifier in the configured NOTIFIER_MODE.
+    """
+    if notifier_mode == "async":
+        resp_slack_notifier_async()
+    else:
+        resp_slack_notifier()
 
 
 def exec_resp_slack_notifier():
-    logging.info("[Requests Notifier]: Starting Response Slack Notifier")
-    slack_notification(channel=alerts_channel_name,
-                       msg_text=":grey_exclamation: RFP Response Slack Notifier Started! :rocket:")
-    while True:
-        try:
-            resp_slack_notifier()
-        except Exception as e:
-            logging.info(f"[Requests Notifier]: RFP Response Slack Notifier is Down,  Error: {e}")
-            slack_notification(channel=alerts_channel_name,
-                               msg_text=":grey_exclamation: :x: RFP Response Slack Notifier is Down :x:",
-                               exception_trace=e)
-            break
-
-    devtracker_sleep(30, 60)
-    slack_notification(channel=alerts_channel_name,
-                       msg_text=":grey_exclamation: :recycle: Restarting RFP Response Slack Notifier :recycle:")
-    exec_resp_slack_notifier()
+    Supervisor(label=":grey_exclamation: RFP Response Slack Notifier", log_prefix="[Requests Notifier]",
+               iteration=lambda _resource: run_resp_slack_notifier(), interval=notifier_interval,
+               script="notifier").run()
 
 
 if __name__ == '__main__':
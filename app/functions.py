@@ -1,14 +1,27 @@
 # coding: utf-8
+import os
+import re
 import sys
 import pytz
 import json
+import queue
+import subprocess
 import random
+import asyncio
 import gspread
+import threading
 import logging
 import datefinder
 from time import sleep
+from time import time
+from time import monotonic
 from datetime import datetime
+from functools import partial
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from gspread.utils import a1_to_rowcol
 from gspread.exceptions import APIError
+import pandas as pd
 
 # Selenium
 from selenium import webdriver
@@ -17,12 +30,26 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import InvalidSessionIdException
 from selenium.webdriver.support import expected_conditions as EC
 
 # WebDriver-Manager
 from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType
+from webdriver_manager.core.os_manager import OperationSystemManager
 
 from functions_slack import slack_notification
+from functions_metrics import bind_metrics_script
+from functions_metrics import sheets_metrics
+from functions_metrics import sheets_retries
+from functions_metrics import logins
+from functions_metrics import login_seconds
+from functions_metrics import sleep_seconds
+from functions_store import store_pending
+from functions_store import store_add_pending
+from functions_store import store_clear_pending
 from import_secrets import *
 
 # Timezone
@@ -51,53 +78,426 @@ def config_logs():
 config_logs()
 
 
-def get_driver():
+def version_major(version):
     """
-    Create & Open Webdriver!
+    Major version of a Chrome/Chromedriver version string, e.g. "ChromeDriver 120.0.6099.109 (...)" -> "120".
+    """
+    match = re.search(r"(\d+)\.\d+", version or "")
+    return match.group(1) if match else ""
 
-    Returns:
+
+def chromedriver_binary_version(path):
+    """
+    Version reported by a chromedriver binary, "" if it can't be run.
+    """
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    match = re.search(r"\d+(?:\.\d+)+", output)
+    return match.group(0) if match else ""
+
+
+# Resolved chromedriver path for this process, sessions started in parallel resolve it once
+chromedriver_resolved = {}
+chromedriver_lock = threading.Lock()
+
+
+def resolve_chromedriver():
+    """
+    Returns the chromedriver path without a network lookup when possible.
+
+    CHROMEDRIVER_PATH is used as is. Otherwise the path last installed by
+    webdriver-manager is read from CHROMEDRIVER_CACHE_PATH and kept while the binary
+    exists and its major version matches the installed Chrome (or the pinned
+    CHROMEDRIVER_VERSION). Only then is ChromeDriverManager asked again; if that
+    fails (e.g. offline) the cached driver is used anyway.
+    """
+    if chromedriver_path:
+        return chromedriver_path
+    with chromedriver_lock:
+        if "path" in chromedriver_resolved:
+            return chromedriver_resolved["path"]
+
+        cached = {}
+        if os.path.exists(chromedriver_cache_path):
+            try:
+                with open(chromedriver_cache_path) as cache_file:
+                    cached = json.load(cache_file)
+            except (OSError, ValueError) as e:
+                logging.warning(f"[Functions]: [Chromedriver] Unreadable cache {chromedriver_cache_path}: "
+                                f"{e}")
+        cached_path = cached.get("path", "")
+
+        if cached_path and os.path.exists(cached_path):
+            expected_version = chromedriver_version or OperationSystemManager().get_browser_version_from_os(
+                ChromeType.GOOGLE)
+            driver_version = chromedriver_binary_version(cached_path)
+            if expected_version and version_major(driver_version) == version_major(expected_version):
+                logging.info(f"[Functions]: [Chromedriver] Using cached driver {driver_version}: "
+                             f"{cached_path}")
+                chromedriver_resolved["path"] = cached_path
+                return cached_path
+            logging.info(f"[Functions]: [Chromedriver] Cached driver {driver_version} doesn't match "
+                         f"{expected_version or 'an unknown Chrome version'}, resolving again")
+
+        try:
+            path = ChromeDriverManager(driver_version=chromedriver_version or None).install()
+        except Exception as e:
+            if not (cached_path and os.path.exists(cached_path)):
+                raise
+            logging.warning(f"[Functions]: [Chromedriver] Lookup failed, using the cached driver: {e}")
+            path = cached_path
+        else:
+            try:
+                with open(chromedriver_cache_path, "w") as cache_file:
+                    json.dump({"path": path, "version": chromedriver_binary_version(path)}, cache_file)
+            except OSError as e:
+                logging.warning(f"[Functions]: [Chromedriver] Unable to write cache "
+                                f"{chromedriver_cache_path}: {e}")
+        chromedriver_resolved["path"] = path
+        return path
+
+
+def chrome_options(load_strategy=None):
     """
-    # Chrome Options
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--window-size=1366,2500")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-application-cache")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.set_capability("detach", True)
+    Chrome Options shared by every browser session.
+    :param load_strategy: "normal" or "eager", defaults to PAGE_LOAD_STRATEGY
+    """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--start-maximized")
+    options.add_argument("--window-size=1366,2500")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-application-cache")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.set_capability("detach", True)
+    options.page_load_strategy = load_strategy or page_load_strategy
 
     # # Browser Cache
     # chrome_prof_path = os.path.abspath("account_data/Selenium")
-    # chrome_options.add_argument("user-data-dir=" + chrome_prof_path)
+    # options.add_argument("user-data-dir=" + chrome_prof_path)
 
     # Experimental Features
     prefs = {"profile.managed_default_content_settings.images": 2}
-    chrome_options.add_experimental_option("prefs", prefs)
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    options.add_experimental_option("prefs", prefs)
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    if page_load_stats_enabled:
+        # Network events for record_page_load
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def get_driver(load_strategy=None):
+    """
+    Create & Open Webdriver!
 
-    # Install Webdriver
-    chromedriver_path = Service(ChromeDriverManager().install())
+    The chromedriver path is resolved once (see resolve_chromedriver), so a restart
+    starts the browser without a network lookup.
 
+    Returns:
+    """
     # Open and Return Driver
-    driver = webdriver.Chrome(service=chromedriver_path, options=chrome_options)
+    service = Service(resolve_chromedriver())
+    driver = webdriver.Chrome(service=service, options=chrome_options(load_strategy))
     return driver
 
 
-def devtracker_sleep(int_min, int_max):
+# URL patterns currently blocked per browser session (driver.session_id)
+request_filters = {}
+# Page loads per (scraper, filtered): [page loads, requests, bytes, blocked requests]
+page_load_stats = {}
+page_load_stats_lock = threading.Lock()
+
+
+def set_request_filter(driver, scraper):
+    """
+    Block BLOCKED_URLS in the browser (CDP Network.setBlockedURLs) before a page load of `scraper`,
+    or lift the block if the scraper isn't in REQUEST_FILTER_SCRAPERS. Sessions shared by several
+    scrapers are switched only when needed. The block applies to the current tab, tabs opened by a
+    click (e.g. bid pages) load unfiltered.
+
+    Returns:
+        bool: True if requests are filtered.
+    """
+    patterns = blocked_urls if scraper in request_filter_scrapers else []
+    if request_filters.get(driver.session_id) != patterns:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        request_filters[driver.session_id] = patterns
+    if page_load_stats_enabled:
+        # Drop the network events of earlier pages
+        driver.get_log("performance")
+    return bool(patterns)
+
+
+def record_page_load(driver, scraper):
+    """
+    Add the requests, bytes & blocked requests of the page just loaded to the page load stats
+    (PAGE_LOAD_STATS).
+    """
+    if not page_load_stats_enabled:
+        return
+    request_count, byte_count, blocked_count = 0, 0, 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            request_count += 1
+            byte_count += message["params"].get("encodedDataLength", 0)
+        elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked_count += 1
+    with page_load_stats_lock:
+        filtered = bool(request_filters.get(driver.session_id))
+        stats = page_load_stats.setdefault((scraper, filtered), [0, 0, 0, 0])
+        stats[0] += 1
+        stats[1] += request_count
+        stats[2] += byte_count
+        stats[3] += blocked_count
+
+
+def page_load_report(log_prefix):
+    """
+    Log the mean requests & KB per page load of each scraper, and what filtering saved
+    when both filtered and unfiltered loads were measured.
+    """
+    with page_load_stats_lock:
+        stats = {key: list(values) for key, values in page_load_stats.items()}
+    for (scraper, filtered), (loads, request_count, byte_count, blocked_count) in sorted(stats.items()):
+        logging.info(f"{log_prefix}: [Page Loads] {scraper} ({'filtered' if filtered else 'unfiltered'}): "
+                     f"{loads} load(s), {request_count / loads:.1f} requests & "
+                     f"{byte_count / loads / 1024:.1f} KB per load, {blocked_count / loads:.1f} blocked")
+    for scraper in sorted({scraper for scraper, filtered in stats if filtered and (scraper, False) in stats}):
+        filtered_stats, unfiltered_stats = stats[(scraper, True)], stats[(scraper, False)]
+        saved_requests = unfiltered_stats[1] / unfiltered_stats[0] - filtered_stats[1] / filtered_stats[0]
+        saved_kb = (unfiltered_stats[2] / unfiltered_stats[0] - filtered_stats[2] / filtered_stats[0]) / 1024
+        logging.info(f"{log_prefix}: [Page Loads] {scraper}: filtering saves {saved_requests:.1f} requests "
+                     f"& {saved_kb:.1f} KB per load")
+
+
+# Seconds spent waiting per call site: {site: [waits, seconds]}
+pacing_stats = {}
+pacing_stats_lock = threading.Lock()
+
+
+def record_wait(site, seconds):
+    """
+    Add a wait to the pacing stats of a call site.
+    """
+    with pacing_stats_lock:
+        site_stats = pacing_stats.setdefault(site, [0, 0.0])
+        site_stats[0] += 1
+        site_stats[1] += seconds
+
+
+def devtracker_sleep(int_min, int_max, site):
     """
     This function is for introducing random pauses in program
     :param int_min: Minimum Sleep in Seconds (num)
     :param int_max: Maximum Sleep in Seconds (num)
+    :param site: Call site label for the pacing stats (str)
     :return: Sleep Interval (num)
     """
     system_random = random.SystemRandom()
     sleep_interval = system_random.randint(int_min, int_max)
     logging.debug(f"[Functions] Sleep Interval: {sleep_interval}")
     sleep(sleep_interval)
+    record_wait(site, sleep_interval)
+    sleep_seconds.inc(sleep_interval, site=site)
+
+
+class RateBudget:
+    """
+    Minimum gap between two calls to the same target, picked at random between
+    `min_gap` and `max_gap` seconds. Time spent working since the last call counts
+    towards the gap, so only the remainder is slept. Slots are reserved under a
+    lock, so concurrent callers are spaced out too.
+    """
+
+    def __init__(self, min_gap, max_gap):
+        self.min_gap = min_gap
+        self.max_gap = max(min_gap, max_gap)
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait for the next slot.
+
+        Returns:
+            float: Seconds waited.
+        """
+        with self.lock:
+            now = monotonic()
+            wait = max(0.0, self.next_slot - now)
+            self.next_slot = max(now, self.next_slot) + random.uniform(self.min_gap, self.max_gap)
+        if wait:
+            sleep(wait)
+        return wait
+
+
+# Rate budgets per target
+pacing_budgets = {
+    "bubble": RateBudget(*bubble_pace),
+    "sheets": RateBudget(*sheets_pace),
+}
+
+
+def pace(target, site):
+    """
+    Wait for the rate budget of a target ("bubble" or "sheets") instead of a fixed sleep.
+    Slack calls are paced per method by the dispatcher in functions_slack.
+    """
+    waited = pacing_budgets[target].acquire()
+    record_wait(site, waited)
+    return waited
+
+
+def wait_for(driver, condition, site, timeout=sel_timeout):
+    """
+    Wait for a DOM condition (WebDriverWait) and record the time spent in the pacing stats under `site`.
+    """
+    start = monotonic()
+    try:
+        return WebDriverWait(driver, timeout).until(condition)
+    finally:
+        record_wait(site, monotonic() - start)
+
+
+def pacing_report(log_prefix):
+    """
+    Log the time spent waiting per call site since the start of the process.
+    """
+    with pacing_stats_lock:
+        site_stats = sorted(pacing_stats.items(), key=lambda item: item[1][1], reverse=True)
+    for site, (waits, seconds) in site_stats:
+        logging.info(f"{log_prefix}: [Pacing] {site}: {seconds:.1f}s over {waits} wait(s)")
+
+
+# Reads the fields of a selector registry (page_selectors.py): {values: {field: text}, missing: [field]}
+extract_fields_script = """
+var fields = arguments[0];
+var result = {values: {current_url: window.location.href}, missing: []};
+Object.keys(fields).forEach(function (field) {
+  var selector = fields[field];
+  var xpath = typeof selector === "string" ? selector : selector[0];
+  var node = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE,
+                               null).singleNodeValue;
+  if (!node) {
+    result.missing.push(field);
+  } else if (typeof selector === "string") {
+    result.values[field] = (node.innerText || node.textContent || "").trim();
+  } else {
+    var attribute = selector[1];
+    result.values[field] = attribute in node ? node[attribute] : node.getAttribute(attribute);
+  }
+});
+return result;
+"""
+
+
+def extract_page_fields(driver, fields, required=()):
+    """
+    Read every field of a selector registry in one WebDriver round trip.
+
+    Args:
+        driver: Selenium WebDriver on the page.
+        fields (dict): {field: XPath or (XPath, attribute)}, see page_selectors.py.
+        required (list): Fields the page must have.
+
+    Returns:
+        tuple: ({field: text or attribute value, "current_url": url}, [missing fields])
+
+    Raises:
+        NoSuchElementException: If a required field is missing, like the find_element calls it replaces.
+    """
+    result = driver.execute_script(extract_fields_script, fields)
+    values, missing = result["values"], result["missing"]
+    if missing:
+        logging.info(f"[Functions]: [Extract Fields] Missing fields: {missing}")
+    missing_required = [field for field in required if field in missing]
+    if missing_required:
+        raise NoSuchElementException(f"Required fields not found: {missing_required}")
+    return values, missing
+
+
+# Month names datefinder reads, other spellings ("Sept") are left to it so both give the same result
+month_numbers = {
+    month: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",),
+         ("jun", "june"), ("jul", "july"), ("aug", "august"), ("sep", "september"),
+         ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for month in names
+}
+# Optional time after a date, as Bubble shows it ("3:45 pm", "at 15:45", ", 3:45:10 PM")
+bubble_time_pattern = r"(?:,?\s+(?:at\s+)?\d{1,2}:\d{2}(?::\d{2})?(?:\s*[ap]\.?m\.?)?)?"
+# Date formats shown by Bubble, matched against the whole text: (pattern, order of the captured parts)
+bubble_date_formats = [
+    # Mar 5, 2024 | March 5 2024 3:45 pm
+    (re.compile(r"([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})" + bubble_time_pattern,
+                re.IGNORECASE),
+     ("month", "day", "year")),
+    # 5 Mar 2024 | 5 March, 2024 3:45 pm
+    (re.compile(r"(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3,9})\.?,?\s+(\d{4})" + bubble_time_pattern,
+                re.IGNORECASE),
+     ("day", "month", "year")),
+    # 3/5/2024 | 03/05/2024 3:45 pm: month first like datefinder, day first when the month can't be one
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})" + bubble_time_pattern, re.IGNORECASE),
+     ("numeric", "day", "year")),
+    # 2024-03-05 | 2024-03-05T15:45:00Z
+    (re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[t\s]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:z|[+-]\d{2}:?\d{2})?)?",
+                re.IGNORECASE),
+     ("year", "month", "day")),
+]
+
+
+def parse_bubble_date(data_str):
+    """
+    Fast path of find_date for the formats Bubble shows (bubble_date_formats).
+
+    Returns:
+        tuple: (day, month, year), or None if the text is not exactly one of those formats.
+    """
+    text = data_str.strip()
+    for pattern, order in bubble_date_formats:
+        match = pattern.fullmatch(text)
+        if not match:
+            continue
+        parts = dict(zip(order, match.groups()))
+        if "numeric" in parts:
+            month, day = int(parts["numeric"]), int(parts["day"])
+            if month > 12 >= day:
+                day, month = month, day
+        elif parts["month"].isalpha():
+            month, day = month_numbers.get(parts["month"].lower()), int(parts["day"])
+        else:
+            month, day = int(parts["month"]), int(parts["day"])
+        try:
+            date = datetime(int(parts["year"]), month, day)
+        except (TypeError, ValueError):
+            return None
+        return date.day, date.month, date.year
+    return None
+
+
+@lru_cache(maxsize=4096)
+def find_date(data_str):
+    """
+    (day, month, year) of the first date in a text, None if there is none.
+
+    Known Bubble formats are parsed by parse_bubble_date, anything else goes to
+    datefinder. Results are cached by the raw text, pages often show the same dates.
+    """
+    date_parts = parse_bubble_date(data_str)
+    if date_parts is None:
+        # Only the first match is used, no need to scan for the others
+        date = next(datefinder.find_dates(data_str), None)
+        date_parts = (date.day, date.month, date.year) if date else None
+    return date_parts
 
 
 def extract_dates(data_str):
@@ -110,28 +510,113 @@ def extract_dates(data_str):
     Returns:
 
     """
-    # a generator will be returned by the datefinder module.
-    # I'm typecasting it to a list. Please read the note of caution provided at the bottom.
-    matches = list(datefinder.find_dates(data_str))
+    date_parts = find_date(data_str)
     # Get the timezone object for UTC
 
     # Get the current time in UTC
     datetime_ny = datetime.now(tz_NY)
 
     # Format the time as a string and print it
-    if len(matches) > 0:
-        # date returned will be a datetime.datetime object. here we are only using the first match.
-        date = matches[0]
-        return f'{date.day}/{date.month}/{date.year}, {datetime_ny.strftime("%H:%M:%S")}'
+    if date_parts:
+        # Only the date of the first match is used, with the current time
+        day, month, year = date_parts
+        return f'{day}/{month}/{year}, {datetime_ny.strftime("%H:%M:%S")}'
     else:
         return datetime.now(tz_NY).strftime("%d/%m/%Y, %H:%M:%S")
 
 
+bubble_url = bubble_base_url
+# Cookie fields accepted by the CDP Network.setCookies command
+cdp_cookie_fields = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+# Saved Bubble session: {"cookies": [...], "saved_at": epoch seconds of the last login check}
+bubble_session = {}
+bubble_session_lock = threading.Lock()
+
+
+def bubble_cookies(driver):
+    """
+    Returns the browser's bubble.io cookies through CDP, whatever page the driver is on.
+    """
+    return driver.execute_cdp_cmd("Network.getCookies", {"urls": [bubble_url]})["cookies"]
+
+
+def load_bubble_session():
+    """
+    Returns the saved Bubble session, read from BUBBLE_SESSION_PATH on first use.
+    """
+    with bubble_session_lock:
+        if not bubble_session and os.path.exists(bubble_session_path):
+            try:
+                with open(bubble_session_path) as session_file:
+                    bubble_session.update(json.load(session_file))
+            except (OSError, ValueError) as e:
+                logging.warning(f"[Functions]: [Bubble Session] Unreadable {bubble_session_path}: {e}")
+        return dict(bubble_session)
+
+
+def save_bubble_session(driver):
+    """
+    Save the cookies of a logged-in driver, readable by the owner only.
+    """
+    cookies = [{field: cookie[field] for field in cdp_cookie_fields if field in cookie}
+               for cookie in bubble_cookies(driver)]
+    session = {"cookies": cookies, "saved_at": time()}
+    try:
+        # Owner-only, the file holds the login cookies
+        session_fd = os.open(bubble_session_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(session_fd, "w") as session_file:
+            json.dump(session, session_file)
+    except OSError as e:
+        logging.warning(f"[Functions]: [Bubble Session] Unable to save {bubble_session_path}: {e}")
+    with bubble_session_lock:
+        bubble_session.clear()
+        bubble_session.update(session)
+    logging.info(f"[Functions]: [Bubble Session] Saved {len(cookies)} cookie(s)")
+
+
+def drop_bubble_session():
+    """
+    Forget the saved session, e.g. once bubble.io answered as logged out, so the next login checks for real.
+    """
+    with bubble_session_lock:
+        bubble_session.clear()
+        try:
+            os.remove(bubble_session_path)
+        except FileNotFoundError:
+            pass
+    logging.warning("[Functions]: [Bubble Session] Saved session dropped")
+
+
+def bubble_session_valid(driver):
+    """
+    Check the login without opening a page.
+
+    The saved session is trusted for BUBBLE_SESSION_CHECK_INTERVAL seconds after the
+    last real check. A browser without bubble.io cookies (e.g. just started) gets the
+    saved ones, then every saved cookie must be in the browser and not expired.
+    """
+    session = load_bubble_session()
+    if not session.get("cookies") or time() - session.get("saved_at", 0) >= bubble_session_check_interval:
+        return False
+    browser_cookies = {cookie["name"]: cookie for cookie in bubble_cookies(driver)}
+    if not browser_cookies:
+        logging.info("[Functions]: [Bubble Session] Restoring saved cookies")
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": session["cookies"]})
+        browser_cookies = {cookie["name"]: cookie for cookie in bubble_cookies(driver)}
+    now = time()
+    for cookie in session["cookies"]:
+        browser_cookie = browser_cookies.get(cookie["name"])
+        if browser_cookie is None or 0 < browser_cookie.get("expires", -1) <= now:
+            logging.info(f"[Functions]: [Bubble Session] Cookie {cookie['name']} missing or expired")
+            return False
+    return True
+
+
 def bubbleio_login(driver):
     # Access requests via the `requests` attribute
     """
-    This Function signs in to Bubbleio and Returns the driver.
-    :return: driver
+    This Function signs in to Bubbleio and Returns whether it is logged in.
+    :return: bool
     """
     login_button_path = "//button[text()='Log in']"
     login_button_path2 = "(//button[text()='Log in'])[2]"
@@ -139,36 +624,48 @@ def bubbleio_login(driver):
     password_path = "//div[text()='Password']/following-sibling::input[@type='password']"
     app_indicator_path = "//div[text()='Apps']"
     retry_count = 0
+    logged_in = False
     # Install Chrome Driver & Open Browser
-    source_url = "https://bubble.io/"
+    source_url = bubble_url
+
+    login_start = monotonic()
+
+    # Saved or current session, checked from its cookies
+    if bubble_session_valid(driver):
+        logging.info("[Functions]: Session cookies valid, Already Logged in..Continue")
+        logins.inc(outcome="session")
+        login_seconds.observe(monotonic() - login_start)
+        return True
 
     # Login
     try:
+        set_request_filter(driver, "login")
+        pace("bubble", site="bubbleio_login")
         driver.get(source_url)
-        sleep(5)
+        # Wait for whichever renders first: the apps list (logged in) or the login button
+        wait_for(driver, EC.any_of(EC.visibility_of_element_located((By.XPATH, app_indicator_path)),
+                                   EC.visibility_of_element_located((By.XPATH, login_button_path))),
+                 site="bubbleio_login")
         driver.find_element(By.XPATH, app_indicator_path)
         logging.info("[Functions]: Already Logged in..Continue")
-        devtracker_sleep(5, 10)
+        logged_in = True
     except Exception as e:
         logging.critical(f"[Functions]: Error Message {e}, Not Logged In")
         while True:
             try:
                 logging.info("[Functions]: Opening Bubble URL")
+                pace("bubble", site="bubbleio_login")
                 driver.get(source_url)
-                sleep(5)
-                WebDriverWait(driver, sel_timeout).until(
-                    EC.visibility_of_element_located((By.XPATH, login_button_path))
-                )
+                wait_for(driver, EC.visibility_of_element_located((By.XPATH, login_button_path)),
+                         site="bubbleio_login")
                 logging.info("[Functions]: Landing page login button detected")
                 driver.find_element(By.XPATH, login_button_path).click()
                 logging.info("[Functions]: Clicked landing page login button")
                 # Login
                 try:
-                    devtracker_sleep(10, 20)
                     # Check of 2nd Login Button
-                    WebDriverWait(driver, sel_timeout).until(
-                        EC.visibility_of_element_located((By.XPATH, login_button_path2))
-                    )
+                    wait_for(driver, EC.visibility_of_element_located((By.XPATH, login_button_path2)),
+                             site="bubbleio_login")
                     logging.info("[Functions]: login page login button detected")
                     # Enter Email & Password
                     sleep(1)
@@ -183,11 +680,10 @@ def bubbleio_login(driver):
                     driver.find_element(By.XPATH, login_button_path2).click()
                     logging.info("[Functions]: Click login page login button.")
                     # Validate Login
-                    WebDriverWait(driver, sel_timeout).until(
-                        EC.visibility_of_element_located((By.XPATH, app_indicator_path))
-                    )
+                    wait_for(driver, EC.visibility_of_element_located((By.XPATH, app_indicator_path)),
+                             site="bubbleio_login")
                     logging.info("[Functions]: login successful")
-                    devtracker_sleep(2, 10)
+                    logged_in = True
                 except TimeoutException:
                     logging.critical("[Functions]: Login Timeout")
                     driver.refresh()
@@ -198,26 +694,254 @@ def bubbleio_login(driver):
                 if retry_count > 3:
                     break
                 # logging.info(driver.page_source)
-                devtracker_sleep(5, 10)
+                devtracker_sleep(5, 10, site="bubbleio_login")
             break
-    return True
+    if logged_in:
+        save_bubble_session(driver)
+    else:
+        drop_bubble_session()
+    logins.inc(outcome="logged_in" if logged_in else "failed")
+    login_seconds.observe(monotonic() - login_start)
+    return logged_in
+
+
+class BubbleLoginError(Exception):
+    """
+    A new browser session couldn't log in to Bubble.
+    """
+
+
+class DriverPool:
+    """
+    Bounded pool of logged-in WebDriver sessions.
+
+    The pool holds `size` slots. An empty slot (None) is filled with a new
+    `get_driver` + `bubbleio_login` session the next time it is taken, so sessions
+    are started on first use and a crashed session is replaced without shrinking
+    the pool.
+    """
+
+    def __init__(self, size=driver_pool_size):
+        self.size = max(1, size)
+        self.idle = queue.Queue()
+        for _ in range(self.size):
+            self.idle.put(None)
+
+    @staticmethod
+    def start_session():
+        """
+        Start a browser session and log it in, the browser is closed if the login fails.
+        """
+        logging.info("[Functions]: [Driver Pool] Starting new browser session")
+        driver = get_driver()
+        try:
+            if not bubbleio_login(driver):
+                raise BubbleLoginError("Unable to log in to Bubble")
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def acquire(self):
+        """
+        Take an idle session, starting one if the slot is empty.
+        """
+        driver = self.idle.get()
+        if driver is None:
+            try:
+                driver = self.start_session()
+            except Exception:
+                self.idle.put(None)
+                raise
+        return driver
+
+    def release(self, driver):
+        self.idle.put(driver)
+
+    @staticmethod
+    def close(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"[Functions]: [Driver Pool] Driver is already closed {e}")
+
+    def discard(self, driver):
+        """
+        Quit a crashed session and free its slot.
+        """
+        self.close(driver)
+        self.idle.put(None)
+
+    @staticmethod
+    def is_alive(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def login(self):
+        """
+        Check the login of every session once, in parallel, like bubbleio_login for a single driver.
+
+        Every slot is taken out of the pool for the check: a live session gets the login
+        check, an empty slot or a crashed session gets a new session, logged in as it starts.
+        Returns False if any session couldn't log in.
+        """
+        slots = [self.idle.get() for _ in range(self.size)]
+
+        def check(driver):
+            if driver is not None and not self.is_alive(driver):
+                logging.critical("[Functions]: [Driver Pool] Browser Crashed, starting a new session")
+                self.close(driver)
+                driver = None
+            try:
+                if driver is None:
+                    driver = self.start_session()
+                    logged_in = True
+                else:
+                    logged_in = bubbleio_login(driver)
+            except BubbleLoginError as e:
+                logging.critical(f"[Functions]: [Driver Pool] {e}")
+                self.idle.put(None)
+                return False
+            except Exception:
+                if driver is not None and not self.is_alive(driver):
+                    self.discard(driver)
+                else:
+                    self.idle.put(driver)
+                raise
+            self.idle.put(driver)
+            return logged_in
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            results = list(executor.map(bind_metrics_script(check), slots))
+        return all(results)
+
+    def run(self, func, item, max_attempts=3):
+        """
+        Call func(item, driver) on an idle session.
+
+        If the session crashed it is replaced and the item is retried on a fresh
+        one, up to `max_attempts` times. Other errors are raised as they are.
+        """
+        attempt = 0
+        while True:
+            driver = self.acquire()
+            try:
+                result = func(item, driver)
+            except (InvalidSessionIdException, WebDriverException):
+                if self.is_alive(driver):
+                    self.release(driver)
+                    raise
+                attempt += 1
+                logging.critical(f"[Functions]: [Driver Pool] Browser Crashed, "
+                                 f"attempt {attempt}/{max_attempts}")
+                self.discard(driver)
+                if attempt >= max_attempts:
+                    raise
+                continue
+            except Exception:
+                self.release(driver)
+                raise
+            self.release(driver)
+            return result
+
+    def imap(self, func, items):
+        """
+        Spread the items across the pool and yield func(item, driver) results in the order of the items.
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            # Worker threads report their metrics under the caller's script
+            yield from executor.map(bind_metrics_script(partial(self.run, func)), items)
+
+    def prune(self):
+        """
+        Quit the idle sessions that crashed, their slots start a new session when next taken.
+        """
+        for _ in range(self.idle.qsize()):
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None and not self.is_alive(driver):
+                logging.warning("[Functions]: [Driver Pool] Dropping crashed browser session")
+                self.discard(driver)
+            else:
+                self.idle.put(driver)
+
+    def quit(self):
+        """
+        Quit every idle session.
+        """
+        while not self.idle.empty():
+            driver = self.idle.get()
+            if driver is not None:
+                self.close(driver)
+
+
+# Process-wide gspread client & handles, shared by every script running in the process. The client keeps
+# its OAuth token (refreshed when it expires) and HTTP session, the handles are reopened only after a
+# 401 (authentication) or 404 (not found) error, see gs_invalidate.
+gs_client = None
+gs_client_lock = threading.Lock()
+gs_spreadsheets = {}
+gs_worksheets = {}
+
+
+def get_gs_client():
+    """
+    Returns the process-wide authorized gspread client, creating it on first use.
+    """
+    global gs_client
+    with gs_client_lock:
+        if gs_client is None:
+            service_acc_creds = json.loads(service_acc_credentials)
+            service_acc_creds["private_key"] = service_acc_creds["private_key"].replace("\\n", "\n")
+            gs_client = gspread.service_account_from_dict(service_acc_creds)
+        return gs_client
+
+
+def gs_invalidate(gs_status_code, sh=None):
+    """
+    Drop the cached Sheets handles an API error made stale.
+
+    A 401 drops the client too, so the next open authenticates again. A 404 drops
+    the spreadsheet and the worksheet `sh` (every worksheet if not given), which
+    are looked up again on the next open_worksheet.
+    """
+    global gs_client
+    if gs_status_code not in (401, 404):
+        return
+    logging.warning(f"[Functions]: [GS Handles] Status Code: {gs_status_code}, Reopening Sheets handles")
+    if gs_status_code == 401:
+        with gs_client_lock:
+            gs_client = None
+    gs_spreadsheets.clear()
+    for sheet_name, cached_sh in list(gs_worksheets.items()):
+        if gs_status_code == 401 or sh is None or cached_sh.id == sh.id:
+            gs_worksheets.pop(sheet_name, None)
 
 
 def open_worksheet(sheet_name):
     """
     Opens a spreadsheet and returns the provided worksheet by name.
     If the sheet doesn't exist in the spreadsheet, it is inserted
-    into it before return.
+    into it before return. Handles are cached, only the first call
+    for a worksheet (or the first after gs_invalidate) hits the API.
     :param sheet_name:
     :return:
     """
+    sh = gs_worksheets.get(sheet_name)
+    if sh is not None:
+        return sh
     # open spreadsheet
-    service_acc_creds = json.loads(service_acc_credentials)
-    service_acc_creds["private_key"] = service_acc_creds["private_key"].replace("\\n", "\n")
     while True:
         try:
-            gc = gspread.service_account_from_dict(service_acc_creds)
-            spreadsheet = gc.open_by_key(spreadsheet_id)
+            spreadsheet = gs_spreadsheets.get(spreadsheet_id)
+            if spreadsheet is None:
+                spreadsheet = get_gs_client().open_by_key(spreadsheet_id)
+                gs_spreadsheets[spreadsheet_id] = spreadsheet
 
             try:
                 sh = spreadsheet.worksheet(sheet_name)
@@ -231,16 +955,87 @@ def open_worksheet(sheet_name):
             if not sh:
                 raise Exception
             else:
+                gs_worksheets[sheet_name] = sh
                 return sh
         except Exception as e:
-            devtracker_sleep(5, 10)
+            if isinstance(e, APIError):
+                gs_invalidate(e.response.status_code)
+            devtracker_sleep(5, 10, site="open_worksheet")
             logging.critical(f"[Functions]: Error connecting with spreadsheet {e}")
             continue
 
 
-def gs_get_data(sh):
+# Local copies of the worksheets read in delta mode, by (spreadsheet, worksheet)
+gs_snapshots = {}
+
+
+def gs_snapshot_apply(sh, sh_range, values):
+    """
+    Write values into the local snapshot of a worksheet, so a delta read
+    reflects our own updates before the next full refresh.
+    """
+    snapshot = gs_snapshots.get((spreadsheet_id, sh.id))
+    if not snapshot:
+        return
+    rows = snapshot["rows"]
+    row_num, col_num = a1_to_rowcol(sh_range.split(":")[0])
+    width = len(rows[0]) if rows else 0
+    for row_offset, row_values in enumerate(values):
+        row_index = row_num - 1 + row_offset
+        while len(rows) <= row_index:
+            rows.append([""] * width)
+        row = rows[row_index]
+        for col_offset, value in enumerate(row_values):
+            col_index = col_num - 1 + col_offset
+            if col_index >= len(row):
+                row.extend([""] * (col_index + 1 - len(row)))
+            row[col_index] = "" if value is None else str(value)
+
+
+def gs_fetch_rows(sh, delta):
+    """
+    Read a worksheet, either in full or only the rows appended since the last read.
+
+    In delta mode the rows are kept in `gs_snapshots` with the row count as the
+    watermark. Each poll re-reads from the last known row to the end of the data
+    (starting on an existing row keeps the range inside the grid), and every
+    `gs_full_refresh_interval` seconds the whole sheet is downloaded again to pick
+    up edits and deleted rows.
+    """
+    pace("sheets", site="gs_fetch_rows")
+    key = (spreadsheet_id, sh.id)
+    snapshot = gs_snapshots.get(key)
+    if (not delta or not snapshot or not snapshot["rows"]
+            or monotonic() - snapshot["refreshed_at"] >= gs_full_refresh_interval):
+        logging.info("[Functions]: [GS GET Data] Full Read")
+        sheet_data = sh.get_all_values()
+        if delta and sheet_data:
+            gs_snapshots[key] = {"rows": sheet_data, "refreshed_at": monotonic()}
+            # Updates still waiting in the write buffer are not in the sheet yet
+            gs_buffer = gs_write_buffers.get(key)
+            if gs_buffer:
+                for sh_range, values in gs_buffer.pending.items():
+                    gs_snapshot_apply(sh, sh_range, values)
+            return list(sheet_data)
+        return sheet_data
+
+    rows = snapshot["rows"]
+    watermark = len(rows)
+    width = len(rows[0])
+    last_col_letter = column_index_to_alphabet(width)
+    new_rows = sh.get_values(f"A{watermark}:{last_col_letter}")
+    new_rows = [row + [""] * (width - len(row)) for row in new_rows[1:]]
+    logging.info(f"[Functions]: [GS GET Data] Delta Read from Row {watermark}, New Rows: {len(new_rows)}")
+    rows.extend(new_rows)
+    return list(rows)
+
+
+@sheets_metrics
+def gs_get_data(sh, delta=False):
     """
     Get Data from a Google WorkSheet.
+    :param sh: gspread Worksheet
+    :param delta: Only download the rows appended since the last delta read (see gs_fetch_rows)
     :return:
     """
     retries = 0
@@ -249,7 +1044,7 @@ def gs_get_data(sh):
     while retries < max_retries:
         try:
             logging.info("[Functions]: [GS GET Data] Getting Sheet Data...")
-            sheet_data = sh.get_all_values()
+            sheet_data = gs_fetch_rows(sh, delta)
             if not sheet_data:
                 logging.error("[Functions]: [GS GET Data] Sheet Data Not Found, Raising Error!")
                 raise Exception
@@ -262,19 +1057,23 @@ def gs_get_data(sh):
             gs_status_code = gs_api_error.response.status_code
             if gs_status_code == 429 or gs_status_code == 503:
                 retries += 1
+                sheets_retries.inc(function="gs_get_data", status=gs_status_code)
                 logging.error(f"[Functions]: [GS GET Data] Retry #{retries} Rate Limit Exceeded")
                 logging.error(f"[Functions]: [GS GET Data] Status Code: {gs_status_code}")
-                devtracker_sleep(60, 80)
+                devtracker_sleep(60, 80, site="gs_get_data")
             else:
                 logging.critical("[Functions]: [GS GET Data] Something went wrong with the Google Sheets")
+                gs_invalidate(gs_status_code, sh)
                 raise
 
         except Exception as e:
             logging.critical(f"[Functions]: [GS GET Data] Error Message: {e}", exc_info=True)
+            sheets_retries.inc(function="gs_get_data", status="error")
 
     return []
 
 
+@sheets_metrics
 def gs_insert_data(sh, bubble_data, script_type):
     """
     Insert Data into Google Sheets.
@@ -283,6 +1082,7 @@ def gs_insert_data(sh, bubble_data, script_type):
     error_count = 0
     while True:
         try:
+            pace("sheets", site="gs_insert_data")
             # sh.append_rows(bubble_data, value_input_option="USER_ENTERED", table_range="A1")
             sh.append_rows(bubble_data, value_input_option="RAW", table_range="A1")
         except APIError as gs_api_error:
@@ -290,13 +1090,16 @@ def gs_insert_data(sh, bubble_data, script_type):
             gs_status_code = gs_api_error.response.status_code
             if gs_status_code == 429 or gs_status_code == 503:
                 logging.critical(f"[Functions]: [GS Insert Data] Status Code: {gs_status_code}")
+                sheets_retries.inc(function="gs_insert_data", status=gs_status_code)
                 error_count += 1
-                devtracker_sleep(60, 80)
+                devtracker_sleep(60, 80, site="gs_insert_data")
             else:
                 logging.critical(f"API Error not handled, Status Code: {gs_status_code}")
+                gs_invalidate(gs_status_code, sh)
                 raise
         except Exception as e:
             logging.critical(f"[Functions]: [GS Insert Data] Error Message: {e}")
+            sheets_retries.inc(function="gs_insert_data", status="error")
             if error_count % 10 == 0:
                 slack_notification(
                     channel=alerts_channel_name,
@@ -309,63 +1112,176 @@ def gs_insert_data(sh, bubble_data, script_type):
                         msg_text=f":rotating_light: [{script_type}] Tracker is down! :rotating_light:",
                         exception_trace=e,
                     )
-            devtracker_sleep(1, 5)
+            devtracker_sleep(1, 5, site="gs_insert_data")
             error_count += 1
             continue
         break
 
 
-def gs_update_data(sh, sh_range, data):
+@sheets_metrics
+def gs_batch_update_data(sh, updates, script_type, max_retries=5):
     """
-    Update Data into Google Sheets for a given cell/range.
-    :return:
+    Update several cells/ranges of a Google WorkSheet in a single API call.
+
+    Args:
+        sh: gspread Worksheet.
+        updates (list): [{"range": "K5", "values": [["Y"]]}, ...] applied in order.
+        script_type (str): Script name used in the Slack alerts.
+        max_retries (int): Attempts before giving up, the caller keeps the updates for the next flush.
+
+    Returns:
+        bool: True if the updates were written.
     """
     error_count = 0
-    while True:
+    while error_count < max_retries:
         try:
-            sh.update(sh_range, data, value_input_option="RAW")
+            pace("sheets", site="gs_batch_update_data")
+            sh.batch_update(updates, value_input_option="RAW")
+            return True
+        except APIError as gs_api_error:
+            logging.critical("[Functions]: [GS Batch Update] Unable to update data in Google Sheets")
+            gs_status_code = gs_api_error.response.status_code
+            if gs_status_code == 429 or gs_status_code == 503:
+                logging.critical(f"[Functions]: [GS Batch Update] Status Code: {gs_status_code}")
+                sheets_retries.inc(function="gs_batch_update_data", status=gs_status_code)
+                error_count += 1
+                devtracker_sleep(60, 80, site="gs_batch_update_data")
+            else:
+                logging.critical(f"API Error not handled, Status Code: {gs_status_code}")
+                gs_invalidate(gs_status_code, sh)
+                raise
         except Exception as e:
-            logging.critical(f"[Functions]: [GS Update Data]: {e}")
+            logging.critical(f"[Functions]: [GS Batch Update] Error Message: {e}")
+            sheets_retries.inc(function="gs_batch_update_data", status="error")
             if error_count % 10 == 0:
                 slack_notification(
                     channel=alerts_channel_name,
-                    msg_text=":rotating_light: Error Updating Response Message Status & "
-                             "Response Thread_ID to Google Sheets:rotating_light:",
+                    msg_text=f":rotating_light: [{script_type}] Error while updating google sheets "
+                             ":rotating_light:",
                     exception_trace=e,
                 )
-                if error_count % 50 == 0:
-                    slack_notification(
-                        channel=alerts_channel_name,
-                        msg_text=":rotating_light: RFP Response Slack " "Notifier is down! :rotating_light:",
-                        exception_trace=e,
-                    )
-            devtracker_sleep(1, 5)
+            devtracker_sleep(1, 5, site="gs_batch_update_data")
             error_count += 1
-            continue
-        break
+    logging.critical(f"[Functions]: [GS Batch Update] Giving up after {error_count} attempts, "
+                     "keeping updates")
+    return False
+
+
+def gs_values_2d(data):
+    """
+    Normalize a cell value, a row or a list of rows into the list of rows the Sheets API expects.
+    """
+    if isinstance(data, (list, tuple)):
+        if data and isinstance(data[0], (list, tuple)):
+            return [list(row) for row in data]
+        return [list(data)]
+    return [[data]]
 
 
-def diff_df_by_column(df_new, df_old, column_name, duplicate_criteria):
+class GSWriteError(Exception):
+    """
+    The write buffer couldn't write its pending updates to Google Sheets.
     """
-    Returns a new DataFrame containing the rows that are present in df_new but not in df_old,
-    based on the specified column name.
 
-    :param df_new: Dataframe
-        The new DataFrame to compare against the old DataFrame.
-    :param df_old: Dataframe
-        The old DataFrame to compare against.
-    :param column_name: str
-        The name of the column used as the basis for comparison.
-    :param duplicate_criteria: list of str
-        A list of column names to consider when removing duplicates from both DataFrames.
-    :return: DataFrame
-        A new DataFrame containing rows from df_new that are not present in df_old.
+
+class GSWriteBuffer:
     """
-    df_new = df_new.drop_duplicates(subset=duplicate_criteria)
-    df_old = df_old.drop_duplicates(subset=duplicate_criteria)
-    diff_rows = df_new[~df_new[column_name].isin(df_old[column_name])]
+    Write-behind buffer for Google Sheets cell updates.
 
-    return diff_rows
+    Updates are collected per range and sent as one `batch_update` once the buffer
+    holds `max_size` ranges, its oldest update is `max_age` seconds old, or `flush()`
+    is called at the end of an iteration. A repeated write to the same range replaces
+    the pending one and moves to the end, so overlapping ranges keep their write order.
+
+    Every update is also recorded in the local store (functions_store) until it is
+    written, so the scripts see their own changes even while Sheets is unreachable.
+    A flush that gives up raises GSWriteError, so the iteration stops before sending
+    more Slack messages whose flags couldn't be saved; the updates stay pending.
+    """
+
+    def __init__(self, sh, script_type, max_size=gs_buffer_max_size, max_age=gs_buffer_max_age):
+        self.sh = sh
+        self.script_type = script_type
+        self.max_size = max_size
+        self.max_age = max_age
+        self.pending = {}
+        self.oldest_write = None
+        self.api_calls = 0
+
+    def update(self, sh_range, data):
+        """
+        Queue a cell/range update, flushing if the size or age limit is reached.
+        """
+        self.pending.pop(sh_range, None)
+        self.pending[sh_range] = gs_values_2d(data)
+        gs_snapshot_apply(self.sh, sh_range, self.pending[sh_range])
+        store_add_pending(self.sh.title, sh_range, self.pending[sh_range])
+        if self.oldest_write is None:
+            self.oldest_write = monotonic()
+        if len(self.pending) >= self.max_size or monotonic() - self.oldest_write >= self.max_age:
+            self.flush()
+
+    def flush(self):
+        """
+        Send every pending update in one `batch_update`.
+
+        Returns:
+            bool: True once nothing is left pending.
+
+        Raises:
+            GSWriteError: If gs_batch_update_data gave up, the updates are kept for the next flush.
+        """
+        if not self.pending:
+            return True
+        updates = [{"range": sh_range, "values": values} for sh_range, values in self.pending.items()]
+        logging.info(f"[Functions]: [GS Write Buffer] Flushing {len(updates)} range(s) to {self.sh.title}")
+        self.api_calls += 1
+        if not gs_batch_update_data(self.sh, updates, self.script_type):
+            raise GSWriteError(f"{len(updates)} range(s) of {self.sh.title} left pending")
+        self.pending = {}
+        self.oldest_write = None
+        store_clear_pending(self.sh.title)
+        return True
+
+
+# Buffers by (spreadsheet, worksheet) so pending updates survive between iterations
+gs_write_buffers = {}
+
+
+def gs_write_buffer(sh, script_type):
+    """
+    Returns the process-wide write buffer for a worksheet, bound to the latest handle.
+    """
+    key = (spreadsheet_id, sh.id)
+    if key not in gs_write_buffers:
+        gs_write_buffers[key] = GSWriteBuffer(sh, script_type)
+        # Updates left over from a previous run (e.g. during a Sheets outage)
+        for sh_range, values in store_pending(sh.title):
+            gs_write_buffers[key].pending.pop(sh_range, None)
+            gs_write_buffers[key].pending[sh_range] = values
+    gs_buffer = gs_write_buffers[key]
+    gs_buffer.sh = sh
+    return gs_buffer
+
+
+class AsyncGSWriter:
+    """
+    Async front of a GSWriteBuffer for the asyncio notifier: the sync buffer run in a worker
+    thread, one call at a time, so a flush never blocks the event loop. Writes aren't
+    made concurrent, they are batched by the buffer as in the sync notifier.
+    """
+
+    def __init__(self, gs_buffer):
+        self.gs_buffer = gs_buffer
+        self.lock = asyncio.Lock()
+
+    async def update(self, sh_range, data):
+        async with self.lock:
+            await asyncio.to_thread(self.gs_buffer.update, sh_range, data)
+
+    async def flush(self):
+        async with self.lock:
+            return await asyncio.to_thread(self.gs_buffer.flush)
 
 
 def column_index_to_alphabet(column_index):
@@ -382,28 +1298,80 @@ def column_index_to_alphabet(column_index):
     return alphabet
 
 
-def add_spreadsheet_range_column(df, columns, columns_to_find):
+def sheet_row_numbers(df):
+    """
+    Sheet row of every DataFrame row as strings (index 0 is sheet row 2), to build A1 addresses column-wise.
     """
-    This function adds the address of the last column for each row into a new columns "Spreadsheet Range"
+    return pd.Series(df.index + 2, index=df.index).astype(str)
+
+
+# Position of the fields in a Leads sheet row
+lead_sheet_fields = {
+    "rfp_id": 0,
+    "budget": 4,
+    "created_date": 5,
+    "requests_thread_id": 7,
+    "req_type": 8,
+    "response_date": 9,
+    "response": 10,
+    "rep_name": 11,
+}
+
+# Format of the created & response dates in the Leads sheet
+lead_date_format = "%d/%m/%Y, %H:%M:%S"
+
+
+def prepare_leads(leads_df, channel_routes, default_channel, channel_ids=None):
+    """
+    Vectorized preparation of the Leads rows for the response notifier.
+
+    Computes, column-wise: the cell addresses of "response_msg_status" and
+    "response_thread_id", the created/response timestamps (fixed format
+    `pd.to_datetime`), the response time, the bid URL and the request channel.
+    Rows whose dates can't be parsed are left out and returned apart, for the
+    caller to report.
+
     Args:
-        df:
-        columns:
-        columns_to_find:
-    Returns:
+        leads_df (DataFrame): Leads rows, index = sheet row - 2 (as from store_get_df).
+        channel_routes (dict): {request type: channel name}.
+        default_channel (str): Channel for the other request types.
+        channel_ids (dict): {channel name: channel ID}.
 
+    Returns:
+        tuple: (leads, invalid_leads_df), leads is a list of
+               Lead: namedtuple(url, budget, req_thread_ts, req_type, response_body, rep_name,
+               total_response_time, req_channel_name, request_channel_id, flag_cell_address,
+               response_th_cell_address),
+               invalid_leads_df the rows of leads_df whose dates aren't in `lead_date_format`.
     """
-    for column_to_find in columns_to_find:
-        col_index = columns.index(column_to_find) + 1
-        spreadsheet_ranges = []
-        row_count = df.shape[0]
-        last_col_letter = column_index_to_alphabet(col_index)
-        start_index = 1
-        for i in range(row_count):
-            spreadsheet_ranges.append(f"{last_col_letter}{start_index + 1}")
-            start_index += 1
-        df[f"{column_to_find}_range"] = spreadsheet_ranges
+    columns = list(leads_df.columns)
+    fields = {field: leads_df.iloc[:, position] for field, position in lead_sheet_fields.items()}
+    sheet_rows = sheet_row_numbers(leads_df)
+
+    created_date_time = pd.to_datetime(fields["created_date"], format=lead_date_format, errors="coerce")
+    response_date_time = pd.to_datetime(fields["response_date"], format=lead_date_format, errors="coerce")
+    total_response_time = response_date_time - created_date_time
+    valid_dates = total_response_time.notna()
 
-    return df
+    req_channel_name = fields["req_type"].map(channel_routes).fillna(default_channel)
+    flag_col_letter = column_index_to_alphabet(columns.index("response_msg_status") + 1)
+    response_th_col_letter = column_index_to_alphabet(columns.index("response_thread_id") + 1)
+    compact_df = pd.DataFrame({
+        "url": bubble_url + "agency-requests/sent?rfp=" + fields["rfp_id"],
+        "budget": fields["budget"],
+        "req_thread_ts": fields["requests_thread_id"],
+        "req_type": fields["req_type"],
+        "response_body": fields["response"],
+        "rep_name": fields["rep_name"],
+        # str() of datetime.timedelta, as posted before ("1 day, 2:03:04")
+        "total_response_time": pd.Series(total_response_time.dt.to_pytimedelta(), index=leads_df.index,
+                                         dtype=object).astype(str),
+        "req_channel_name": req_channel_name,
+        "request_channel_id": req_channel_name.map(channel_ids or {}).fillna(""),
+        "flag_cell_address": flag_col_letter + sheet_rows,
+        "response_th_cell_address": response_th_col_letter + sheet_rows,
+    })[valid_dates]
+    return list(compact_df.itertuples(index=False, name="Lead")), leads_df[~valid_dates]
 
 
 def limit_string(input_string, max_chars):
@@ -0,0 +1,260 @@
+# coding: utf-8
+import os
+import copy
+import logging
+import tempfile
+import threading
+from time import monotonic
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from import_secrets import *
+
+# Script the current thread / task works for ("requests", "bids", "notifier"), set by the Supervisor
+metrics_script_var = ContextVar("metrics_script", default="")
+# Latency buckets (seconds), from a Slack call to a Bubble login
+default_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+openmetrics_content_type = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def metrics_script():
+    """
+    Script label of the current context, "" outside of a tracker.
+    """
+    return metrics_script_var.get()
+
+
+def set_metrics_script(script):
+    metrics_script_var.set(script)
+
+
+def bind_metrics_script(func):
+    """
+    Wrap a function so it runs with the caller's script label, for worker threads (e.g. a ThreadPoolExecutor),
+    which don't inherit it.
+    """
+    script = metrics_script()
+
+    def bound(*args, **kwargs):
+        set_metrics_script(script)
+        return func(*args, **kwargs)
+
+    return bound
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+class Metric:
+    """
+    Metric family with a value per label set. Every family is labelled by `script`, taken from
+    the current context unless passed explicitly.
+    """
+
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = ("script", *labels)
+        self.values = {}
+        self.lock = threading.Lock()
+        metrics_registry.append(self)
+
+    def label_values(self, labels):
+        labels.setdefault("script", metrics_script())
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help_text}"]
+        with self.lock:
+            values = sorted((key, copy.deepcopy(value)) for key, value in self.values.items())
+        for label_values, value in values:
+            lines += self.render_samples(list(zip(self.label_names, label_values)), value)
+        return lines
+
+    def render_samples(self, labels, value):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render_samples(self, labels, value):
+        return [f"{self.name}_total{format_labels(labels)} {value}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=default_buckets):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, seconds, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            # [cumulative bucket counts, sum, count]
+            value = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    value[0][index] += 1
+            value[1] += seconds
+            value[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of a `with` block, even if it raises.
+        """
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.observe(monotonic() - start, **labels)
+
+    def render_samples(self, labels, value):
+        bucket_counts, total, count = value
+        samples = [f"{self.name}_bucket{format_labels(labels + [('le', bound)])} {bucket_count}"
+                   for bound, bucket_count in zip(self.buckets, bucket_counts)]
+        samples += [f"{self.name}_bucket{format_labels(labels + [('le', '+Inf')])} {count}",
+                    f"{self.name}_sum{format_labels(labels)} {total}",
+                    f"{self.name}_count{format_labels(labels)} {count}"]
+        return samples
+
+
+metrics_registry = []
+
+# Google Sheets (gs_get_data, gs_insert_data, gs_batch_update_data)
+sheets_calls = Counter("tracker_sheets_calls", "Google Sheets calls by outcome (ok, error, exhausted)",
+                       ("function", "outcome"))
+sheets_retries = Counter("tracker_sheets_retries", "Google Sheets attempts retried, by status code",
+                         ("function", "status"))
+sheets_call_seconds = Histogram("tracker_sheets_call_seconds",
+                                "Google Sheets call duration, retries included", ("function",))
+# Slack Web API, per Slack function & method
+slack_calls = Counter("tracker_slack_calls", "Slack Web API calls by outcome (ok, error, ratelimited)",
+                      ("function", "method", "outcome"))
+slack_call_seconds = Histogram("tracker_slack_call_seconds", "Slack Web API call duration",
+                               ("function", "method"))
+# Bubble pages & login
+page_loads = Counter("tracker_page_loads", "Bubble page loads by outcome (ok, timeout, error)",
+                     ("page", "outcome"))
+page_load_seconds = Histogram("tracker_page_load_seconds",
+                              "Bubble page load duration, until the page is usable", ("page",))
+logins = Counter("tracker_logins", "bubbleio_login calls by outcome (session, logged_in, failed)",
+                 ("outcome",))
+login_seconds = Histogram("tracker_login_seconds", "bubbleio_login duration")
+# Sleeps & iterations
+sleep_seconds = Counter("tracker_sleep_seconds", "Seconds slept in devtracker_sleep, by call site", ("site",))
+iteration_seconds = Histogram("tracker_iteration_seconds", "Tracker iteration duration")
+crashes = Counter("tracker_crashes", "Tracker runs ended by an error")
+
+
+def sheets_metrics(func):
+    """
+    Count & time a Google Sheets function. An exception counts as "error", an empty or False
+    result (the function gave up after its retries) as "exhausted".
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = monotonic()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "exhausted" if result is not None and not result else "ok"
+            return result
+        finally:
+            sheets_calls.inc(function=func.__name__, outcome=outcome)
+            sheets_call_seconds.observe(monotonic() - start, function=func.__name__)
+
+    return wrapper
+
+
+def render_metrics():
+    """
+    Every metric in the OpenMetrics text format.
+    """
+    lines = []
+    for metric in metrics_registry:
+        lines += metric.render()
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(script=""):
+    """
+    Write the metrics to METRICS_PATH, if set, replacing the file at once so a scraper never reads
+    half a file. "{script}" in the path is replaced by the script, for trackers run as separate processes.
+    """
+    if not metrics_path:
+        return
+    path = metrics_path.format(script=script or "tracker")
+    try:
+        # A temporary file per writer, the trackers of the orchestrator may write the same path at once
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            # Readable by a scraper running as another user, like a file from open()
+            os.fchmod(fd, 0o644)
+            with os.fdopen(fd, "w") as metrics_file:
+                metrics_file.write(render_metrics())
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logging.warning(f"[Metrics]: Unable to write {path}: {e}")
+
+
+metrics_server = {}
+metrics_server_lock = threading.Lock()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", openmetrics_content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics():
+    """
+    Serve the metrics on http://METRICS_HOST:METRICS_PORT/metrics from a background thread, once per process.
+    """
+    if not metrics_port:
+        return
+    with metrics_server_lock:
+        if metrics_server:
+            return
+        try:
+            metrics_server["httpd"] = ThreadingHTTPServer((metrics_host, metrics_port), MetricsHandler)
+        except OSError as e:
+            logging.warning(f"[Metrics]: Unable to serve metrics on {metrics_host}:{metrics_port}: {e}")
+            return
+        threading.Thread(target=metrics_server["httpd"].serve_forever, name="metrics", daemon=True).start()
+    logging.info(f"[Metrics]: Serving metrics on http://{metrics_host}:{metrics_port}/metrics")
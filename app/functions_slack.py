@@ -1,12 +1,175 @@
 # coding: utf-8
+import atexit
 import logging
+import threading
 import traceback
-from time import sleep
+from time import monotonic
+from bisect import bisect_right
+from collections import deque
+from decimal import Decimal
+from decimal import InvalidOperation
+from concurrent.futures import Future
 from import_secrets import *
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
-client = WebClient(token=slack_secret)
+from functions_metrics import metrics_script
+from functions_metrics import slack_calls
+from functions_metrics import slack_call_seconds
+
+client = WebClient(token=slack_secret, base_url=slack_api_url)
+
+
+class SlackDispatcher:
+    """
+    Outbound queue for Slack Web API calls.
+
+    Calls are made by a single worker thread from a queue per method, each method
+    spaced by its budget in `slack_method_intervals` (SLACK_METHOD_INTERVALS).
+    The worker makes the oldest queued call whose method is due, so a paced or
+    rate limited method never holds up the others. A `ratelimited` error pauses the method for the
+    `Retry-After` seconds Slack sends back and the call stays first in its queue
+    to be retried instead of being dropped. `submit` returns a Future, so callers can
+    fire and forget or wait for the response (e.g. for the message `ts`). The worker
+    thread is started by the first call, importing the module starts nothing.
+    """
+
+    def __init__(self, web_client, max_retries=5):
+        self.client = web_client
+        self.max_retries = max_retries
+        # {method: deque of [sequence, kwargs, ok_errors, labels, future, retries]}
+        self.calls = {}
+        self.next_call_at = {}
+        self.sequence = 0
+        self.pending = 0
+        self.condition = threading.Condition()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+
+    def start(self):
+        with self.worker_lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name="slack-dispatcher", daemon=True)
+                self.worker.start()
+
+    def submit(self, method, function, ok_errors=(), **kwargs):
+        """
+        Queue a call of a WebClient method.
+
+        Args:
+            method (str): WebClient method name, e.g. "chat_postMessage".
+            function (str): Slack function making the call, for the metrics labels.
+            ok_errors (tuple): Slack errors to treat as success, e.g. ("already_reacted",).
+            **kwargs: Arguments of the method.
+
+        Returns:
+            Future: Resolves to the SlackResponse, or raises the SlackApiError.
+        """
+        labels = {"script": metrics_script(), "function": function}
+        self.start()
+        future = Future()
+        with self.condition:
+            self.sequence += 1
+            call = [self.sequence, kwargs, ok_errors, labels, future, 0]
+            self.calls.setdefault(method, deque()).append(call)
+            self.pending += 1
+            self.condition.notify_all()
+        return future
+
+    def call(self, method, function, ok_errors=(), **kwargs):
+        """
+        Queue a call and wait for its response.
+        """
+        return self.submit(method, function, ok_errors, **kwargs).result()
+
+    def next_call(self):
+        """
+        Wait for the oldest queued call whose method is due and take it off its queue.
+        """
+        with self.condition:
+            while True:
+                now = monotonic()
+                queued = [method for method, method_calls in self.calls.items() if method_calls]
+                due = [(self.calls[method][0][0], method) for method in queued
+                       if self.next_call_at.get(method, 0.0) <= now]
+                if due:
+                    method = min(due)[1]
+                    return method, self.calls[method].popleft()
+                self.condition.wait(min((self.next_call_at[method] - now for method in queued), default=None))
+
+    def run(self):
+        while True:
+            method, call = self.next_call()
+            _sequence, kwargs, ok_errors, labels, future, retries = call
+            self.next_call_at[method] = monotonic() + slack_method_intervals.get(method, 1.0)
+            try:
+                future.set_result(self.execute(method, kwargs, ok_errors, labels))
+            except SlackApiError as _e:
+                if _e.response.get("error") == "ratelimited" and retries < self.max_retries:
+                    self.retry(method, call, _e)
+                    continue
+                logging.critical(f"[Slack Functions]: [Dispatcher] {method} failed: {_e}")
+                future.set_exception(_e)
+            except Exception as _e:
+                logging.critical(f"[Slack Functions]: [Dispatcher] {method} failed: {_e}")
+                future.set_exception(_e)
+            with self.condition:
+                self.pending -= 1
+                self.condition.notify_all()
+
+    def retry(self, method, call, error):
+        """
+        Put a rate limited call back first in its queue and pause the method for `Retry-After` seconds.
+        """
+        retry_after = next((int(value) for name, value in error.response.headers.items()
+                            if name.lower() == "retry-after"), 1)
+        call[5] += 1
+        logging.warning(f"[Slack Functions]: [Dispatcher] {method} rate limited, "
+                        f"retry #{call[5]} in {retry_after}s")
+        with self.condition:
+            self.next_call_at[method] = monotonic() + retry_after
+            self.calls[method].appendleft(call)
+
+    def execute(self, method, kwargs, ok_errors, labels):
+        """
+        One attempt of a call, the `ok_errors` resolve to Slack's response.
+        """
+        call_start = monotonic()
+        outcome = "error"
+        try:
+            response = getattr(self.client, method)(**kwargs)
+            outcome = "ok"
+            return response
+        except SlackApiError as _e:
+            error = _e.response.get("error")
+            if error in ok_errors:
+                outcome = "ok"
+                return _e.response
+            if error == "ratelimited":
+                outcome = "ratelimited"
+            raise
+        finally:
+            slack_call_seconds.observe(monotonic() - call_start, method=method, **labels)
+            slack_calls.inc(method=method, outcome=outcome, **labels)
+
+    def drain(self, timeout=None):
+        """
+        Wait until every queued call has been made, or `timeout` seconds.
+
+        Returns:
+            bool: False if calls were still queued when the timeout expired.
+        """
+        with self.condition:
+            if self.condition.wait_for(lambda: not self.pending, timeout):
+                return True
+            logging.warning(f"[Slack Functions]: [Dispatcher] {self.pending} call(s) still queued "
+                            f"after {timeout}s, dropped")
+            return False
+
+
+slack_dispatcher = SlackDispatcher(client)
+# Deliver the fire-and-forget calls still queued when the process exits, for up to SLACK_DRAIN_TIMEOUT seconds
+atexit.register(slack_dispatcher.drain, slack_drain_timeout)
 
 
 def get_elapsed_ts(channel_id, message_ts):
@@ -21,7 +184,8 @@ def get_elapsed_ts(channel_id, message_ts):
 
     """
     try:
-        response = client.conversations_history(channel=channel_id, latest=message_ts, limit=1, inclusive=True)
+        response = slack_dispatcher.call("conversations_history", "get_elapsed_ts", channel=channel_id,
+                                         latest=message_ts, limit=1, inclusive=True)
         message = response['messages'][0]
         original_timestamp = message['ts']
         logging.info(f"[Slack Functions]: Original Timestamp: {original_timestamp}")
@@ -32,9 +196,127 @@ def get_elapsed_ts(channel_id, message_ts):
         return ""
 
 
+# Message timestamps per channel:
+# {channel_id: {"ts": sorted [(Decimal, str)], "oldest", "latest", "fetched_at"}}
+channel_histories = {}
+
+
+def fetch_channel_history(channel_id, oldest, latest):
+    """
+    Returns the ts of every message in [oldest, latest], walking all pages of conversations_history.
+    """
+    message_ts = []
+    cursor = None
+    while True:
+        response = slack_dispatcher.call("conversations_history", "fetch_channel_history", channel=channel_id,
+                                         oldest=str(oldest), latest=str(latest), inclusive=True, limit=200,
+                                         cursor=cursor)
+        message_ts += [(Decimal(message['ts']), message['ts']) for message in response['messages']]
+        cursor = (response.get('response_metadata') or {}).get('next_cursor')
+        if not cursor:
+            break
+    return message_ts
+
+
+def index_channel_history(channel_id, oldest, latest):
+    """
+    Make sure the cached history of a channel covers [oldest, latest], fetching only the missing part.
+    The cache is dropped after SLACK_HISTORY_CACHE_TTL seconds so deleted (expired) messages fall out.
+    """
+    history = channel_histories.get(channel_id)
+    if history and monotonic() - history["fetched_at"] >= slack_history_cache_ttl:
+        history = None
+    if not history:
+        history = {"ts": fetch_channel_history(channel_id, oldest, latest), "oldest": oldest,
+                   "latest": latest, "fetched_at": monotonic()}
+    else:
+        if oldest < history["oldest"]:
+            history["ts"] += fetch_channel_history(channel_id, oldest, history["oldest"])
+            history["oldest"] = oldest
+        if latest > history["latest"]:
+            history["ts"] += fetch_channel_history(channel_id, history["latest"], latest)
+            history["latest"] = latest
+    history["ts"] = sorted(set(history["ts"]))
+    channel_histories[channel_id] = history
+    return history
+
+
+def resolve_thread_ts(channel_id, stored_ts_list):
+    """
+    Batched get_elapsed_ts: maps the thread timestamps stored in the sheet to the original message ts.
+
+    One paginated conversations_history window covering the oldest to newest stored
+    timestamp is fetched per channel and cached across iterations. As with
+    get_elapsed_ts, a stored timestamp resolves to the latest message at or before
+    it; when the window holds no such message the single-message lookup is used,
+    so expired threads still resolve to "".
+
+    Args:
+        channel_id (str): Channel ID of the request threads.
+        stored_ts_list (list): Thread timestamps as stored in the sheet.
+
+    Returns:
+        dict: {stored_ts: original ts or ""}
+    """
+    stored_ts_values = {}
+    for stored_ts in set(stored_ts_list):
+        try:
+            stored_ts_values[stored_ts] = Decimal(stored_ts)
+        except InvalidOperation:
+            logging.error(f"[Slack Functions]: Invalid thread timestamp: {stored_ts}")
+
+    resolved_ts = {stored_ts: "" for stored_ts in stored_ts_list}
+    if not stored_ts_values:
+        return resolved_ts
+    try:
+        history = index_channel_history(channel_id, min(stored_ts_values.values()),
+                                        max(stored_ts_values.values()))
+    except SlackApiError as _e:
+        logging.critical(f"[Slack Functions]: Error retrieving channel history: {_e.response['error']}")
+        history = {"ts": []}
+
+    for stored_ts, stored_value in stored_ts_values.items():
+        position = bisect_right(history["ts"], (stored_value, chr(0x10FFFF)))
+        if position:
+            resolved_ts[stored_ts] = history["ts"][position - 1][1]
+        else:
+            resolved_ts[stored_ts] = get_elapsed_ts(channel_id, stored_ts) or ""
+    logging.info(f"[Slack Functions]: Resolved {len(stored_ts_values)} thread timestamps")
+    return resolved_ts
+
+
+# Channel name -> ID, filled by one paginated conversations_list sweep
+channel_ids = {}
+# monotonic() of the last sweep, -inf until the first one so any cache age is past the TTL
+channel_ids_refreshed_at = float("-inf")
+
+
+def refresh_channel_ids():
+    """
+    Walks every page of conversations_list once and caches the name -> ID of all private channels.
+    """
+    global channel_ids_refreshed_at
+    swept_channel_ids = {}
+    cursor = None
+    while True:
+        response = slack_dispatcher.call("conversations_list", "refresh_channel_ids", types="private_channel",
+                                         exclude_archived=True, limit=1000, cursor=cursor)
+        for channel in response['channels']:
+            swept_channel_ids[channel['name']] = channel['id']
+        cursor = (response.get('response_metadata') or {}).get('next_cursor')
+        if not cursor:
+            break
+    channel_ids.clear()
+    channel_ids.update(swept_channel_ids)
+    channel_ids_refreshed_at = monotonic()
+    logging.info(f"[Slack Functions]: Cached {len(channel_ids)} channel IDs")
+
+
 def channel_name_to_id(channel_name):
     """
     Function to convert channel name to ID
+    Lookups are served from the cache, which is swept again once it is older than
+    SLACK_CHANNEL_CACHE_TTL seconds or when a name is missing from it.
     Args:
         channel_name:
 
@@ -42,20 +324,18 @@ def channel_name_to_id(channel_name):
 
     """
     try:
-        response = client.conversations_list(types="private_channel")
-        channels = response['channels']
-        # Iterate through the channels to find the matching channel name
-        for channel in channels:
-            if channel['name'] == channel_name:
-                channel_id = channel['id']
-                return channel_id
-        else:
-            logging.error(f"[Slack Functions]: No channel found with the name: {channel_name}")
+        cache_age = monotonic() - channel_ids_refreshed_at
+        # A miss re-sweeps at most once a minute, so an unknown name can't trigger a sweep per lookup
+        if cache_age >= slack_channel_cache_ttl or (channel_name not in channel_ids and cache_age >= 60):
+            refresh_channel_ids()
+        if channel_name in channel_ids:
+            return channel_ids[channel_name]
+        logging.error(f"[Slack Functions]: No channel found with the name: {channel_name}")
     except Exception as _e:
         logging.critical(f"[Slack Functions]: Error retrieving channel list: {str(_e)}")
 
 
-def respond_to_slack_message(channel, thread_ts, text, msg_blocks=None):
+def respond_to_slack_message(channel, thread_ts, text, msg_blocks=None, wait=False):
     """
     Sends a response message to a Slack thread.
 
@@ -64,19 +344,26 @@ def respond_to_slack_message(channel, thread_ts, text, msg_blocks=None):
         thread_ts (str): Timestamp of the thread to respond to.
         text (str): Text of the response message.
         msg_blocks: Creatively rich or interactive message.
+        wait (bool): Wait for Slack's response, otherwise the message is queued and sent in the background.
 
     Returns:
+        Future: When not waiting, the queued call (failures are logged by the dispatcher).
         None: Prints a success message if the message is sent successfully.
               Prints an error message if there is an issue sending the message.
     """
+    future = slack_dispatcher.submit(
+        "chat_postMessage",
+        "respond_to_slack_message",
+        channel=channel,
+        thread_ts=thread_ts,
+        text=text,
+        blocks=msg_blocks,
+        unfurl_links=False
+    )
+    if not wait:
+        return future
     try:
-        response = client.chat_postMessage(
-            channel=channel,
-            thread_ts=thread_ts,
-            text=text,
-            blocks=msg_blocks,
-            unfurl_links=False
-        )
+        response = future.result()
         if response["ok"]:
             logging.info(f"[Slack Functions]: Message sent successfully.")
         else:
@@ -86,35 +373,78 @@ def respond_to_slack_message(channel, thread_ts, text, msg_blocks=None):
         logging.critical(f"[Slack Functions]: Failed to send message. Error: {_e.response['error']}")
 
 
+# Reaction errors that a retry can't fix
+permanent_reaction_errors = {"invalid_name", "message_not_found", "channel_not_found", "not_in_channel",
+                             "too_many_reactions", "is_archived", "invalid_auth", "not_authed"}
+
+
+def add_slack_reaction(channel_id, thread_ts, reaction, retries_left=2):
+    """
+    Queue a single reaction on the dispatcher, `already_reacted` counts as success.
+    A failed reaction is retried right away, up to `retries_left` times, before the returned Future resolves.
+
+    Returns:
+        Future: Resolves to True once the reaction is added, False once it is given up.
+    """
+    added = Future()
+
+    def attempt(attempts_left):
+        future = slack_dispatcher.submit("reactions_add", "add_slack_reaction",
+                                         ok_errors=("already_reacted",), channel=channel_id,
+                                         timestamp=thread_ts, name=reaction)
+
+        def on_done(done_future):
+            _e = done_future.exception()
+            if _e is None:
+                logging.info(f"[Slack Functions]: Reaction '{reaction}' added successfully.")
+                added.set_result(True)
+                return
+            error = _e.response.get("error") if isinstance(_e, SlackApiError) else str(_e)
+            if attempts_left > 0 and error not in permanent_reaction_errors:
+                logging.warning(f"[Slack Functions]: Retrying reaction '{reaction}'. Error: {error}")
+                attempt(attempts_left - 1)
+            else:
+                logging.critical(f"[Slack Functions]: Failed to add reaction '{reaction}'. Error: {error}")
+                added.set_result(False)
+
+        future.add_done_callback(on_done)
+
+    attempt(retries_left)
+    return added
+
+
 def react_to_slack_message(channel_id, thread_ts, reactions):
     """
     Reacts to a Slack message with one or more specified emoji reactions.
 
+    The reactions are queued on the Slack dispatcher and added in the background,
+    within the reactions.add rate limit, so the caller moves on right away. Each
+    reaction is queued once the previous one is added or given up, so a retried
+    reaction can't land out of order. `already_reacted` counts as success.
+
     Args:
         channel_id (str): Channel ID where the message is located.
         thread_ts (str): Timestamp of the message to react to.
         reactions (list): Emoji reactions to add to the message.
 
     Returns:
-        None: Prints a success message if the reaction is added successfully.
-              Prints an error message if there is an issue adding the reaction.
+        list: Futures of the reactions, see add_slack_reaction.
     """
+    reacted = [Future() for _ in reactions]
 
-    try:
-        for reaction in reactions:
-            response = client.reactions_add(
-                channel=channel_id,
-                timestamp=thread_ts,
-                name=reaction
-            )
-            if response["ok"]:
-                logging.info(f"[Slack Functions]: Reaction '{reaction}' added successfully.")
-            else:
-                logging.error(f"[Slack Functions]: Failed to add reaction. Error: {response['error']}")
-            sleep(2)
+    def react(index):
+        if index == len(reactions):
+            return
+        added = add_slack_reaction(channel_id, thread_ts, reactions[index])
 
-    except SlackApiError as _e:
-        logging.critical(f"[Slack Functions]: Failed to add reaction. Error: {_e.response['error']}")
+        def on_done(done_future):
+            reacted[index].set_result(done_future.result())
+            react(index + 1)
+
+        added.add_done_callback(on_done)
+
+    react(0)
+    return reacted
 
 
 def slack_notification(channel, msg_text, exception_trace=None):
@@ -131,7 +461,8 @@ def slack_notification(channel, msg_text, exception_trace=None):
 
     """
     try:
-        response = client.chat_postMessage(channel=channel, text=msg_text, parse="full")
+        response = slack_dispatcher.call("chat_postMessage", "slack_notification", channel=channel,
+                                         text=msg_text, parse="full")
         msg_ts = response["ts"]
         if exception_trace:
             # Set the exception traceback as a code block
@@ -163,7 +494,9 @@ def edit_slack_message(channel, thread_ts, updated_text):
     :return:
     """
     try:
-        edit_response = client.chat_update(
+        edit_response = slack_dispatcher.call(
+            "chat_update",
+            "edit_slack_message",
             channel=channel,
             ts=thread_ts,
             text=updated_text
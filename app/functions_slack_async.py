@@ -0,0 +1,116 @@
+# coding: utf-8
+import asyncio
+import logging
+from time import monotonic
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.http_retry.builtin_async_handlers import AsyncRateLimitErrorRetryHandler
+
+from import_secrets import *
+from functions_slack import permanent_reaction_errors
+from functions_metrics import slack_calls
+from functions_metrics import slack_call_seconds
+
+
+class AsyncSlack:
+    """
+    Async counterpart of the Slack functions, on `AsyncWebClient`.
+
+    Calls are spaced by the per-method budgets of the sync dispatcher (`slack_method_intervals`),
+    `chat_postMessage` per channel as Slack rates it, so messages to the request & response
+    channels don't wait on each other; the other methods are rated per workspace.
+    `ratelimited` responses are retried after `Retry-After` by the client's retry
+    handler, and one aiohttp session keeps the connection alive. Like the sync
+    functions, errors are logged and the call returns None.
+
+    Usage:
+        async with AsyncSlack() as slack:
+            ts = await slack.post_message(channel, text)
+    """
+
+    def __init__(self):
+        self.session = None
+        self.client = None
+        self.next_call_at = {}
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession()
+        self.client = AsyncWebClient(token=slack_secret, base_url=slack_api_url, session=self.session)
+        self.client.retry_handlers.append(AsyncRateLimitErrorRetryHandler(max_retry_count=5))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def call(self, method, function, ok_errors=(), **kwargs):
+        """
+        Call a WebClient method once its budget allows, reserving the slot so concurrent callers
+        are spaced out.
+        `function` is the AsyncSlack function making the call, for the metrics labels.
+        """
+        loop = asyncio.get_running_loop()
+        budget = (method, kwargs.get("channel")) if method == "chat_postMessage" else (method, None)
+        async with self.lock:
+            now = loop.time()
+            wait = max(0.0, self.next_call_at.get(budget, 0.0) - now)
+            self.next_call_at[budget] = max(now, self.next_call_at.get(budget, 0.0)) + \
+                slack_method_intervals.get(method, 1.0)
+        if wait:
+            await asyncio.sleep(wait)
+        call_start = monotonic()
+        outcome = "error"
+        try:
+            response = await getattr(self.client, method)(**kwargs)
+            outcome = "ok"
+            return response
+        except SlackApiError as _e:
+            if _e.response.get("error") in ok_errors:
+                outcome = "ok"
+                return _e.response
+            raise
+        finally:
+            slack_call_seconds.observe(monotonic() - call_start, function=function, method=method)
+            slack_calls.inc(function=function, method=method, outcome=outcome)
+
+    async def post_message(self, channel, text, thread_ts=None):
+        """
+        Post a message (or a thread reply) and return its ts, like slack_notification.
+        """
+        try:
+            if thread_ts:
+                response = await self.call("chat_postMessage", "post_message", channel=channel,
+                                           thread_ts=thread_ts, text=text, unfurl_links=False)
+            else:
+                response = await self.call("chat_postMessage", "post_message", channel=channel, text=text,
+                                           parse="full")
+            logging.info("[Slack Functions]: [Async] Message sent successfully.")
+            return response["ts"]
+        except SlackApiError as _e:
+            logging.critical(f"[Slack Functions]: [Async] Failed to send message. "
+                             f"Error: {_e.response['error']}")
+
+    async def edit_message(self, channel, thread_ts, updated_text):
+        try:
+            return await self.call("chat_update", "edit_message", channel=channel, ts=thread_ts,
+                                   text=updated_text)
+        except SlackApiError as _e:
+            logging.critical(f"[Slack Functions]: [Async] Error editing message: {_e.response['error']}")
+
+    async def react(self, channel_id, thread_ts, reactions, max_retries=2):
+        """
+        Add the reactions in order, each retried on its own, `already_reacted` counts as success.
+        """
+        for reaction in reactions:
+            for attempt in range(max_retries + 1):
+                try:
+                    await self.call("reactions_add", "react", ok_errors=("already_reacted",),
+                                    channel=channel_id, timestamp=thread_ts, name=reaction)
+                    break
+                except SlackApiError as _e:
+                    error = _e.response.get("error")
+                    if error in permanent_reaction_errors or attempt == max_retries:
+                        logging.critical(f"[Slack Functions]: [Async] Failed to add reaction '{reaction}'. "
+                                         f"Error: {error}")
+                        break
@@ -0,0 +1,269 @@
+# coding: utf-8
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+from time import time
+
+import pandas as pd
+from gspread.utils import a1_to_rowcol
+
+from import_secrets import *
+
+# Columns copied out of the row data into their own indexed columns
+indexed_columns = ["rfp_id", "etl_status", "response_msg_status"]
+
+store_lock = threading.RLock()
+# SQLite connection, opened on first use so importing the functions doesn't create the database
+store_connection = {}
+store_schema = """
+    CREATE TABLE IF NOT EXISTS sheet_rows (
+        sheet_name TEXT NOT NULL,
+        row_num INTEGER NOT NULL,
+        rfp_id TEXT NOT NULL DEFAULT '',
+        etl_status TEXT NOT NULL DEFAULT '',
+        response_msg_status TEXT NOT NULL DEFAULT '',
+        row_data TEXT NOT NULL,
+        content_hash TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (sheet_name, row_num)
+    );
+    CREATE INDEX IF NOT EXISTS idx_rows_rfp_id ON sheet_rows (sheet_name, rfp_id);
+    CREATE INDEX IF NOT EXISTS idx_rows_etl_status ON sheet_rows (sheet_name, etl_status);
+    CREATE INDEX IF NOT EXISTS idx_rows_response_msg_status ON sheet_rows (sheet_name, response_msg_status);
+    CREATE TABLE IF NOT EXISTS sheet_columns (
+        sheet_name TEXT PRIMARY KEY,
+        columns TEXT NOT NULL,
+        first_row INTEGER NOT NULL,
+        synced_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS pending_writes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sheet_name TEXT NOT NULL,
+        sh_range TEXT NOT NULL,
+        sh_values TEXT NOT NULL
+    );
+    """
+
+
+def get_store_conn():
+    """
+    Returns the process-wide connection to STATE_DB_PATH, opening it and creating the tables on first use.
+    """
+    with store_lock:
+        if "conn" not in store_connection:
+            store_conn = sqlite3.connect(state_db_path, check_same_thread=False)
+            store_conn.execute("PRAGMA journal_mode=WAL")
+            store_conn.executescript(store_schema)
+            # Stores created before the content hash was kept: the column is filled as rows are synced
+            store_columns = [column[1] for column in store_conn.execute("PRAGMA table_info(sheet_rows)")]
+            if "content_hash" not in store_columns:
+                store_conn.execute("ALTER TABLE sheet_rows ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+            store_connection["conn"] = store_conn
+        return store_connection["conn"]
+
+
+# Hashes of the rows last synced per sheet, unchanged rows are skipped on the next sync
+synced_row_hashes = {}
+
+
+def content_hash(row, width):
+    """
+    Stable hash of the first `width` cells of a row, as Google Sheets returns them.
+
+    Missing trailing cells count as "" and every value as its string, so a scraped
+    row and the same row read back from the sheet hash the same.
+    """
+    cells = ["" if value is None else str(value) for value in row[:width]]
+    cells += [""] * (width - len(cells))
+    return hashlib.sha1(json.dumps(cells).encode("utf-8")).hexdigest()
+
+
+def store_row_params(sheet_name, row_num, columns, row):
+    """
+    Build the `sheet_rows` values for a row, copying the indexed columns out of the row data.
+    """
+    indexed_values = []
+    for column in indexed_columns:
+        col_index = columns.index(column) if column in columns else -1
+        indexed_values.append(str(row[col_index]) if 0 <= col_index < len(row) else "")
+    return (sheet_name, row_num, *indexed_values, json.dumps(row), content_hash(row, len(columns)))
+
+
+def store_sheet_columns(sheet_name):
+    """
+    Returns the column names and the sheet row of the first data row, (None, None) if never synced.
+    """
+    store_conn = get_store_conn()
+    result = store_conn.execute(
+        "SELECT columns, first_row FROM sheet_columns WHERE sheet_name = ?", (sheet_name,)
+    ).fetchone()
+    if not result:
+        return None, None
+    return json.loads(result[0]), result[1]
+
+
+def store_sync(sheet_name, sheet_data, columns=None):
+    """
+    Mirror a worksheet read by gs_get_data into the store.
+
+    Only rows that changed since the last sync are written. Updates still pending
+    for Google Sheets are re-applied afterwards, so the store keeps our own writes
+    until the sheet has them.
+
+    Args:
+        sheet_name (str): Worksheet title.
+        sheet_data (list): Rows of the worksheet, the first one being the header.
+        columns (list): Column names for worksheets without a header, every row is then data.
+
+    Returns:
+        int: Number of rows written.
+    """
+    store_conn = get_store_conn()
+    if not sheet_data:
+        logging.warning(f"[Store]: No data to sync for {sheet_name}, keeping the local copy")
+        return 0
+    if columns is None:
+        columns, rows, first_row = list(sheet_data[0]), sheet_data[1:], 2
+    else:
+        rows, first_row = sheet_data, 1
+
+    with store_lock, store_conn:
+        old_columns, _ = store_sheet_columns(sheet_name)
+        old_hashes = synced_row_hashes.get(sheet_name, []) if old_columns == columns else []
+        new_hashes = [hash(tuple(row)) for row in rows]
+        changed_rows = [
+            store_row_params(sheet_name, first_row + i, columns, row)
+            for i, row in enumerate(rows)
+            if i >= len(old_hashes) or old_hashes[i] != new_hashes[i]
+        ]
+        store_conn.executemany("INSERT OR REPLACE INTO sheet_rows VALUES (?, ?, ?, ?, ?, ?, ?)", changed_rows)
+        store_conn.execute(
+            "DELETE FROM sheet_rows WHERE sheet_name = ? AND row_num >= ?",
+            (sheet_name, first_row + len(rows)),
+        )
+        store_conn.execute(
+            "INSERT OR REPLACE INTO sheet_columns VALUES (?, ?, ?, ?)",
+            (sheet_name, json.dumps(columns), first_row, time()),
+        )
+        synced_row_hashes[sheet_name] = new_hashes
+        for sh_range, values in store_pending(sheet_name):
+            store_apply(sheet_name, sh_range, values)
+
+    logging.info(f"[Store]: Synced {sheet_name}, Rows Written: {len(changed_rows)}")
+    return len(changed_rows)
+
+
+def store_apply(sheet_name, sh_range, values):
+    """
+    Write a range update into the stored rows of a worksheet.
+    """
+    store_conn = get_store_conn()
+    columns, _ = store_sheet_columns(sheet_name)
+    if columns is None:
+        return
+    row_num, col_num = a1_to_rowcol(sh_range.split(":")[0])
+    with store_lock, store_conn:
+        for row_offset, row_values in enumerate(values):
+            result = store_conn.execute(
+                "SELECT row_data FROM sheet_rows WHERE sheet_name = ? AND row_num = ?",
+                (sheet_name, row_num + row_offset),
+            ).fetchone()
+            row = json.loads(result[0]) if result else [""] * len(columns)
+            for col_offset, value in enumerate(row_values):
+                col_index = col_num - 1 + col_offset
+                if col_index >= len(row):
+                    row.extend([""] * (col_index + 1 - len(row)))
+                row[col_index] = "" if value is None else str(value)
+            store_conn.execute(
+                "INSERT OR REPLACE INTO sheet_rows VALUES (?, ?, ?, ?, ?, ?, ?)",
+                store_row_params(sheet_name, row_num + row_offset, columns, row),
+            )
+
+
+def store_add_pending(sheet_name, sh_range, values):
+    """
+    Record an update that has not been written to Google Sheets yet and apply it locally.
+    """
+    store_conn = get_store_conn()
+    with store_lock, store_conn:
+        store_conn.execute(
+            "INSERT INTO pending_writes (sheet_name, sh_range, sh_values) VALUES (?, ?, ?)",
+            (sheet_name, sh_range, json.dumps(values)),
+        )
+        store_apply(sheet_name, sh_range, values)
+
+
+def store_pending(sheet_name):
+    """
+    Returns the updates not written to Google Sheets yet, oldest first.
+    """
+    store_conn = get_store_conn()
+    with store_lock:
+        results = store_conn.execute(
+            "SELECT sh_range, sh_values FROM pending_writes WHERE sheet_name = ? ORDER BY id", (sheet_name,)
+        ).fetchall()
+    return [(sh_range, json.loads(sh_values)) for sh_range, sh_values in results]
+
+
+def store_clear_pending(sheet_name):
+    """
+    Forget the pending updates of a worksheet once they are written to Google Sheets.
+    """
+    store_conn = get_store_conn()
+    with store_lock, store_conn:
+        store_conn.execute("DELETE FROM pending_writes WHERE sheet_name = ?", (sheet_name,))
+
+
+def store_get_df(sheet_name, exclude=None):
+    """
+    Returns the stored rows of a worksheet as a DataFrame.
+
+    The index is the row position as in `pd.DataFrame(sheet_data[1:])`, i.e. the
+    sheet row minus 2, so cell addresses can be built from it after filtering.
+
+    Args:
+        sheet_name (str): Worksheet title.
+        exclude (dict): {indexed column: value}, rows holding that value are left out.
+
+    Returns:
+        DataFrame
+    """
+    store_conn = get_store_conn()
+    columns, _ = store_sheet_columns(sheet_name)
+    if columns is None:
+        return pd.DataFrame([], columns=[])
+    query = "SELECT row_num, row_data FROM sheet_rows WHERE sheet_name = ?"
+    params = [sheet_name]
+    for column, value in (exclude or {}).items():
+        if column not in indexed_columns:
+            raise ValueError(f"{column} is not an indexed column")
+        # Two range conditions instead of != so SQLite can use the index
+        query += f" AND ({column} < ? OR {column} > ?)"
+        params += [value, value]
+    query += " ORDER BY row_num"
+    with store_lock:
+        results = store_conn.execute(query, params).fetchall()
+    rows = [json.loads(row_data) for _, row_data in results]
+    rows = [row + [""] * (len(columns) - len(row)) if len(row) < len(columns) else row[:len(columns)]
+            for row in rows]
+    return pd.DataFrame(rows, columns=columns, index=[row_num - 2 for row_num, _ in results])
+
+
+def store_content_index(sheet_name, key_column="rfp_id"):
+    """
+    Returns {key: (sheet row, content hash, row)} for a worksheet, from the indexed rows of the store.
+
+    Lets a scraper tell a new row from a changed or an unchanged one without reading
+    the worksheet. When a key appears on several rows the first one is kept.
+    """
+    store_conn = get_store_conn()
+    if key_column not in indexed_columns:
+        raise ValueError(f"{key_column} is not an indexed column")
+    with store_lock:
+        results = store_conn.execute(
+            f"SELECT {key_column}, row_num, content_hash, row_data FROM sheet_rows "
+            f"WHERE sheet_name = ? AND {key_column} > '' ORDER BY row_num DESC",
+            (sheet_name,),
+        ).fetchall()
+    return {key: (row_num, row_hash, json.loads(row_data)) for key, row_num, row_hash, row_data in results}
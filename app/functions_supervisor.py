@@ -0,0 +1,117 @@
+# coding: utf-8
+import logging
+from time import monotonic
+from collections import deque
+
+from import_secrets import *
+from functions import devtracker_sleep
+from functions_slack import slack_notification
+from functions_metrics import crashes
+from functions_metrics import iteration_seconds
+from functions_metrics import serve_metrics
+from functions_metrics import set_metrics_script
+from functions_metrics import write_metrics_file
+
+
+class Supervisor:
+    """
+    Restart loop for a tracker, in place of the scripts calling themselves after a crash.
+
+    Each run calls `setup()` (e.g. start & log in a driver), then `iteration(resource)`
+    every `interval` ("min,max" seconds) until it raises, and always `teardown(resource)`
+    afterwards, so drivers are closed before the next run. Restarts wait with an
+    exponential backoff (SUPERVISOR_BACKOFF_MIN doubled per consecutive crash, up to
+    SUPERVISOR_BACKOFF_MAX). A crash loop, SUPERVISOR_CRASH_LOOP_COUNT crashes within
+    SUPERVISOR_CRASH_LOOP_WINDOW seconds, is reported once and waits the maximum backoff.
+    The loop never grows the stack, so memory stays flat however often it restarts.
+
+    Metrics recorded while it runs are labelled with `script` ("requests", "bids",
+    "notifier") and written out (METRICS_PATH) after every iteration.
+    """
+
+    def __init__(self, label, log_prefix, iteration, interval, setup=None, teardown=None, script=""):
+        self.label = label
+        self.log_prefix = log_prefix
+        self.script = script
+        self.iteration = iteration
+        self.interval = interval
+        self.setup = setup or (lambda: None)
+        self.teardown = teardown or (lambda _resource: None)
+        self.restarts = 0
+        self.consecutive_crashes = 0
+        self.crash_times = deque()
+        self.in_crash_loop = False
+
+    def backoff(self):
+        """
+        Seconds to wait before the next restart, from the consecutive crash count.
+        """
+        if self.in_crash_loop:
+            return supervisor_backoff_max
+        return min(supervisor_backoff_max, supervisor_backoff_min * 2 ** (self.consecutive_crashes - 1))
+
+    def record_crash(self):
+        """
+        Count a crash and update the crash-loop state, alerting when a crash loop starts.
+        """
+        now = monotonic()
+        self.consecutive_crashes += 1
+        self.crash_times.append(now)
+        while self.crash_times and now - self.crash_times[0] > supervisor_crash_loop_window:
+            self.crash_times.popleft()
+        crash_loop = len(self.crash_times) >= supervisor_crash_loop_count
+        if crash_loop and not self.in_crash_loop:
+            logging.critical(f"{self.log_prefix}: [Supervisor] Crash loop: {len(self.crash_times)} crashes "
+                             f"in {supervisor_crash_loop_window}s")
+            slack_notification(
+                channel=alerts_channel_name,
+                msg_text=f"{self.label} :rotating_light: Crash loop, {len(self.crash_times)} crashes in "
+                         f"{supervisor_crash_loop_window}s. Restarting every {supervisor_backoff_max}s "
+                         f":rotating_light:",
+            )
+        self.in_crash_loop = crash_loop
+
+    def run_once(self):
+        """
+        Set up, iterate until an iteration raises, then tear down.
+        """
+        resource = None
+        try:
+            resource = self.setup()
+            while True:
+                with iteration_seconds.time():
+                    self.iteration(resource)
+                # A completed iteration ends the crash streak
+                self.consecutive_crashes = 0
+                write_metrics_file(self.script)
+                devtracker_sleep(*self.interval, site="supervisor_interval")
+        except Exception as e:
+            crashes.inc()
+            write_metrics_file(self.script)
+            logging.critical(f"{self.log_prefix}: {self.label} is Down, Error:", exc_info=True)
+            slack_notification(channel=alerts_channel_name, msg_text=f"{self.label} :x: is Down :x:",
+                               exception_trace=e)
+        finally:
+            try:
+                if resource is not None:
+                    self.teardown(resource)
+            except Exception as e:
+                logging.warning(f"{self.log_prefix}: [Supervisor] Cleanup failed: {e}")
+
+    def run(self):
+        set_metrics_script(self.script)
+        serve_metrics()
+        logging.info(f"{self.log_prefix}: Starting {self.label}")
+        slack_notification(channel=alerts_channel_name, msg_text=f"{self.label} Started! :rocket:")
+        while True:
+            self.run_once()
+            self.record_crash()
+            self.restarts += 1
+            backoff = self.backoff()
+            logging.info(f"{self.log_prefix}: [Supervisor] Restart {self.restarts} in {backoff}s "
+                         f"(consecutive crashes: {self.consecutive_crashes})")
+            devtracker_sleep(backoff, backoff + backoff // 2, site="supervisor_backoff")
+            slack_notification(
+                channel=alerts_channel_name,
+                msg_text=f"{self.label} :recycle: Restarting (restart {self.restarts}) :recycle:",
+            )
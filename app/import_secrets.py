@@ -6,12 +6,16 @@ from dotenv import load_dotenv
 # load_dotenv()
 load_dotenv("../.env.prod")
 
+# Bubble
+bubble_base_url = os.environ.get("BUBBLE_BASE_URL", "https://bubble.io/")
+
 # CREDs
 email = os.environ.get("EMAIL")
 password = os.environ.get("PASS")
 
 # Slack
 slack_messaging = os.environ.get("SLACK_MESSAGING")
+slack_api_url = os.environ.get("SLACK_API_URL", "https://www.slack.com/api/")
 slack_secret = os.environ.get("SLACK_APP_SECRET")
 alerts_channel_name = os.environ.get("ALERTS_SLACK_CH_NAME")
 request_channel_name = os.environ.get("AGENCY_REQS_SLACK_CH_NAME")
@@ -24,3 +28,100 @@ service_acc_credentials = os.environ.get("SERVICE_ACCOUNT_CREDENTIALS")
 req_sheet_name = os.environ.get("REQ_SHEET_NAME")
 bid_sheet_name = os.environ.get("BID_SHEET_NAME")
 lead_sheet_name = os.environ.get("LEADS_SHEET_NAME")
+
+# GS Write Buffer
+gs_buffer_max_size = int(os.environ.get("GS_BUFFER_MAX_SIZE", 100))
+gs_buffer_max_age = int(os.environ.get("GS_BUFFER_MAX_AGE", 30))
+
+# GS Delta Reads (seconds between full downloads of a worksheet)
+gs_full_refresh_interval = int(os.environ.get("GS_FULL_REFRESH_INTERVAL", 300))
+
+# Local State Store
+state_db_path = os.environ.get("STATE_DB_PATH", "tracker_state.db")
+
+# Browser Sessions used in parallel by the Requests script
+driver_pool_size = int(os.environ.get("DRIVER_POOL_SIZE", 1))
+
+# Pacing: "min,max" seconds between two calls to each target
+bubble_pace = [float(gap) for gap in os.environ.get("BUBBLE_PACE", "1,3").split(",")]
+sheets_pace = [float(gap) for gap in os.environ.get("SHEETS_PACE", "1,1").split(",")]
+# Slack: "method:seconds" minimum gap between two calls of a Web API method, from Slack's rate limit tiers
+slack_method_intervals = {
+    method: float(gap) for method, gap in (
+        pair.split(":") for pair in os.environ.get(
+            "SLACK_METHOD_INTERVALS",
+            "chat_postMessage:1.0,chat_update:1.2,reactions_add:1.2,conversations_history:1.2,"
+            "conversations_list:3.0",
+        ).split(",")
+    )
+}
+
+# Slack Channel Name -> ID Cache (seconds)
+slack_channel_cache_ttl = int(os.environ.get("SLACK_CHANNEL_CACHE_TTL", 3600))
+
+# Slack Channel History Cache used to resolve thread timestamps (seconds)
+slack_history_cache_ttl = int(os.environ.get("SLACK_HISTORY_CACHE_TTL", 3600))
+
+# Seconds the queued Slack calls are given to be sent when the process exits
+slack_drain_timeout = float(os.environ.get("SLACK_DRAIN_TIMEOUT", 30))
+
+# Response Notifier: "async" posts leads concurrently, "sync" one after the other
+notifier_mode = os.environ.get("NOTIFIER_MODE", "async")
+notifier_concurrency = int(os.environ.get("NOTIFIER_CONCURRENCY", 5))
+
+# Bids: seconds between two scans that reopen every bid on the scanned pages to pick up edited bids
+bids_rescan_interval = int(os.environ.get("BIDS_RESCAN_INTERVAL", 3600))
+
+# Loop intervals: "min,max" seconds between two iterations of each tracker
+requests_interval = [int(gap) for gap in os.environ.get("REQUESTS_INTERVAL", "10,20").split(",")]
+bids_interval = [int(gap) for gap in os.environ.get("BIDS_INTERVAL", "10,15").split(",")]
+notifier_interval = [int(gap) for gap in os.environ.get("NOTIFIER_INTERVAL", "5,10").split(",")]
+
+# Orchestrator: trackers run together in one process, on one browser pool & one Sheets/Slack client
+orchestrator_jobs = [job.strip() for job in os.environ.get("ORCHESTRATOR_JOBS",
+                                                           "requests,bids,notifier").split(",")]
+
+# Supervisor: restart backoff (seconds, doubled per consecutive crash) & crash-loop detection
+supervisor_backoff_min = int(os.environ.get("SUPERVISOR_BACKOFF_MIN", 30))
+supervisor_backoff_max = int(os.environ.get("SUPERVISOR_BACKOFF_MAX", 1800))
+supervisor_crash_loop_count = int(os.environ.get("SUPERVISOR_CRASH_LOOP_COUNT", 5))
+supervisor_crash_loop_window = int(os.environ.get("SUPERVISOR_CRASH_LOOP_WINDOW", 600))
+
+# Chromedriver: an explicit path skips the lookup, a pinned version is checked against the cached driver
+chromedriver_path = os.environ.get("CHROMEDRIVER_PATH", "")
+chromedriver_version = os.environ.get("CHROMEDRIVER_VERSION", "")
+chromedriver_cache_path = os.environ.get("CHROMEDRIVER_CACHE_PATH", "chromedriver_cache.json")
+
+# Browser page load strategy: "normal" waits for every resource, "eager" only for the DOM
+page_load_strategy = os.environ.get("PAGE_LOAD_STRATEGY", "normal")
+
+# Bubble session cookies kept on disk & restored into new browsers; a navigation check is made at most
+# this often (seconds)
+bubble_session_path = os.environ.get("BUBBLE_SESSION_PATH", "bubble_session.json")
+bubble_session_check_interval = int(os.environ.get("BUBBLE_SESSION_CHECK_INTERVAL", 3600))
+
+# Request filtering: URL patterns the browser doesn't fetch (CDP Network.setBlockedURLs), for the listed
+# scrapers
+blocked_urls = [pattern.strip() for pattern in os.environ.get(
+    "BLOCKED_URLS",
+    "*.woff,*.woff2,*.ttf,*.otf,*.png,*.jpg,*.jpeg,*.gif,*.svg,*.ico,*.mp4,*google-analytics.com*,"
+    "*googletagmanager.com*,*doubleclick.net*,*facebook.net*,*hotjar.com*,*intercom.io*,*intercomcdn.com*,"
+    "*segment.io*,*segment.com*,*sentry.io*,*fullstory.com*,*mixpanel.com*",
+).split(",") if pattern.strip()]
+request_filter_scrapers = [scraper.strip() for scraper in os.environ.get("REQUEST_FILTER_SCRAPERS",
+                                                                         "requests,bids").split(",")]
+# Page load stats (requests & bytes per page load, from the browser performance log): "YES" to collect
+page_load_stats_enabled = os.environ.get("PAGE_LOAD_STATS", "NO") == "YES"
+
+# Rep Directory: names of the reps signing bid responses, matched in the response text
+rep_directory = [name.strip() for name in os.environ.get(
+    "REP_DIRECTORY",
+    "Andrew Woodard,ANDREW WOODARD,FINN KACZMAROWSKI,HAILEY HUSFELT,MATT GRAHAM,BAZ FILMER,JOHN GEMMA,"
+    "JACOB KAPLAN,MATT POLIO",
+).split(",") if name.strip()]
+
+# Metrics (OpenMetrics text): file rewritten after every iteration ("{script}" is replaced by the tracker)
+# and/or an HTTP endpoint on METRICS_HOST:METRICS_PORT/metrics; empty path / port 0 turns it off
+metrics_path = os.environ.get("METRICS_PATH", "")
+metrics_host = os.environ.get("METRICS_HOST", "127.0.0.1")
+metrics_port = int(os.environ.get("METRICS_PORT", 0))
@@ -0,0 +1,72 @@
+# coding: utf-8
+import logging
+import threading
+
+from import_secrets import *
+from functions import DriverPool
+from functions import get_gs_client
+from functions_slack import slack_notification
+from functions_supervisor import Supervisor
+from requests_main import requests_main_script
+from bids_main import bids_pool_iteration
+from bids_slack_notifier import run_resp_slack_notifier
+
+
+def tracker_jobs(driver_pool):
+    """
+    The trackers the orchestrator can run, each under its own Supervisor.
+
+    Requests & Bids take their browser sessions from the same pool, so one
+    logged-in Chrome (DRIVER_POOL_SIZE) serves both. The pool outlives their
+    restarts: a restart only drops the sessions that crashed.
+    """
+    return {
+        "requests": Supervisor(label=":incoming_envelope: RFP Requests Tracker",
+                               log_prefix="[Orchestrator | Requests]",
+                               iteration=requests_main_script, interval=requests_interval,
+                               setup=lambda: driver_pool, teardown=lambda pool: pool.prune(),
+                               script="requests"),
+        "bids": Supervisor(label=":outbox_tray: RFP Bids Tracker", log_prefix="[Orchestrator | Bids]",
+                           iteration=bids_pool_iteration, interval=bids_interval,
+                           setup=lambda: driver_pool, teardown=lambda pool: pool.prune(), script="bids"),
+        "notifier": Supervisor(label=":grey_exclamation: RFP Response Slack Notifier",
+                               log_prefix="[Orchestrator | Notifier]",
+                               iteration=lambda _resource: run_resp_slack_notifier(),
+                               interval=notifier_interval, script="notifier"),
+    }
+
+
+def exec_orchestrator():
+    """
+    Run the selected trackers (ORCHESTRATOR_JOBS) in one process, each on its own thread,
+    sharing the browser pool, the gspread client and the Slack client.
+    """
+    logging.info(f"[Orchestrator]: Starting Trackers: {', '.join(orchestrator_jobs)}")
+    driver_pool = DriverPool()
+    get_gs_client()
+    jobs = tracker_jobs(driver_pool)
+    unknown_jobs = [name for name in orchestrator_jobs if name not in jobs]
+    if unknown_jobs:
+        raise ValueError(f"Unknown ORCHESTRATOR_JOBS: {unknown_jobs}, expected some of {list(jobs)}")
+
+    slack_notification(channel=alerts_channel_name,
+                       msg_text=f":rocket: RFP Trackers Started: {', '.join(orchestrator_jobs)}")
+    threads = []
+    for name in orchestrator_jobs:
+        thread = threading.Thread(target=jobs[name].run, name=name, daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        logging.info("[Orchestrator]: Stopping Trackers")
+    finally:
+        driver_pool.quit()
+        logging.info("[Orchestrator]: Closing Drivers")
+
+
+if __name__ == '__main__':
+    exec_orchestrator()
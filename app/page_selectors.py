@@ -0,0 +1,28 @@
+# coding: utf-8
+# Selector registry of the Bubble pages the trackers scrape. Each field maps to an XPath (the element's
+# text is read) or to an (XPath, attribute) pair. extract_page_fields (functions.py) reads every field of
+# a registry in one `execute_script` round trip.
+
+# Request page (https://bubble.io/agency-requests/...?rfp=...)
+request_page_fields = {
+    "proj_title": "//*[contains(@class, 'cnaBaVaB8')]",
+    "client_first_name": "//*[text()='Full name']/following-sibling::div[1]",
+    "tags": "//div[contains(@class, 'cnaBaVaR8')]",
+    "pricing": "//*[contains(@class, 'cnaBaVaU8')]",
+    "req_created_date": "//div[contains(@class, 'cnaBaVaF8')]",
+    # "description": "//div[contains(@class, 'cnaNaq2')]",
+    "description": "//div[contains(@class, 'coaKaPaY')]",
+}
+request_page_required = list(request_page_fields)
+
+# Bid page, opened in a new tab from the Sent bids page
+bid_page_fields = {
+    "name": "//*[contains(@class, 'cnaBaVaB8')]",
+    "response_date": "//div[contains(@class, 'cnaBaVy8')]",
+    "response": "//div[contains(@class, 'cnaBaWc8')]",
+    "rep": "(//div[contains(@class, 'cnaBaWc8')]//u)[last()]",
+    "rep_profile": "(//div[contains(@class, 'cnaBaWc8')]"
+                   "//*[contains(text(), 'Rapid Dev Contributor Profile | Bubble')])",
+    "calendly_href": ("//a[contains(@href, 'calendly.com')]", "href"),
+}
+bid_page_required = ["name", "response_date", "response"]
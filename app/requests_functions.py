@@ -1,8 +1,8 @@
 # coding: utf-8
 import logging
+from time import monotonic
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import WebDriverException
 from selenium.common.exceptions import InvalidSessionIdException
@@ -11,8 +11,17 @@ from selenium.webdriver.support import expected_conditions as EC
 from functions import limit_string
 from functions import extract_dates
 from functions import devtracker_sleep
+from functions import pace
+from functions import wait_for
+from functions import extract_page_fields
+from functions import set_request_filter
+from functions import record_page_load
 from functions_slack import slack_notification
+from functions_metrics import page_loads
+from functions_metrics import page_load_seconds
 from functions_slack import respond_to_slack_message
+from page_selectors import request_page_fields
+from page_selectors import request_page_required
 
 # Browser Settings
 sel_timeout = 20
@@ -39,9 +48,16 @@ def open_req_url(rfp_req_url, driver):
     req_name_path = "//*[contains(@class, 'cnaBaVaB8')]"
     while True:
         try:
+            set_request_filter(driver, "requests")
+            pace("bubble", site="open_req_url")
+            load_start = monotonic()
             driver.get(rfp_req_url)
-            WebDriverWait(driver, sel_timeout).until(EC.visibility_of_element_located((By.XPATH, req_name_path)))
+            wait_for(driver, EC.visibility_of_element_located((By.XPATH, req_name_path)), site="open_req_url")
+            page_load_seconds.observe(monotonic() - load_start, page="request")
+            page_loads.inc(page="request", outcome="ok")
+            record_page_load(driver, "requests")
         except TimeoutException:
+            page_loads.inc(page="request", outcome="timeout")
             logging.critical("Timeout opening the Request URL", exc_info=True)
             if driver.find_element(By.XPATH, "//*[text()='Job request inbox']"):
                 if retry_count >= 10:
@@ -54,6 +70,7 @@ def open_req_url(rfp_req_url, driver):
                 logging.error("Something Went Wrong, Retrying")
                 continue
         except Exception as e:
+            page_loads.inc(page="request", outcome="error")
             if isinstance(e, InvalidSessionIdException):
                 raise InvalidSessionIdException
             if isinstance(e, WebDriverException):
@@ -61,10 +78,9 @@ def open_req_url(rfp_req_url, driver):
             else:
                 logging.critical("[Script Log | Requests]: Exception while trying to click, retrying!")
                 logging.critical(f"[Script Log | Requests]: Error Message {e}")
-                devtracker_sleep(1, 2)
+                devtracker_sleep(1, 2, site="open_req_url")
                 continue
         break
-    devtracker_sleep(1, 2)
 
 
 def get_rfp_request(rfp_req_url, driver):
@@ -82,33 +98,21 @@ def get_rfp_request(rfp_req_url, driver):
     # Open Req_URL
     open_req_url(rfp_req_url, driver)
 
-    # Extract Project Title
-    proj_title_path = "//*[contains(@class, 'cnaBaVaB8')]"
-    proj_title = str(driver.find_element(By.XPATH, proj_title_path).text).strip()
-
-    # Extract Client First Name
-    f_name_path = "//*[text()='Full name']/following-sibling::div[1]"
-    client_first_name = str(driver.find_element(By.XPATH, f_name_path).text).strip()
-
-    # Extract Tags
-    tags = driver.find_element(By.XPATH, "//div[contains(@class, 'cnaBaVaR8')]").text
-
-    # Extract Pricing
-    pricing = driver.find_element(By.XPATH, "//*[contains(@class, 'cnaBaVaU8')]").text
-
-    # Extract Request Date
-    req_created_date = driver.find_element(By.XPATH, "//div[contains(@class, 'cnaBaVaF8')]").text
-    req_created_date = extract_dates(req_created_date)
+    # Extract every field in one round trip
+    fields, _ = extract_page_fields(driver, request_page_fields, required=request_page_required)
+    proj_title = fields["proj_title"]
+    client_first_name = fields["client_first_name"]
+    tags = fields["tags"]
+    pricing = fields["pricing"]
+    req_created_date = extract_dates(fields["req_created_date"])
 
     # Extract Request Description
     description_char_limit = 50000
-    # description = driver.find_element(By.XPATH, "//div[contains(@class, 'cnaNaq2')]").text
-    description = driver.find_element(By.XPATH, "//div[contains(@class, 'coaKaPaY')]").text
     # Updating Job Description for Google Sheets' 50000 Char Limit per Cell
-    description = limit_string(input_string=description, max_chars=description_char_limit)
+    description = limit_string(input_string=fields["description"], max_chars=description_char_limit)
 
     # Extract Request URL
-    request_url = driver.current_url
+    request_url = fields["current_url"]
 
     # Extract the Rfp_id
     rfp_id = str(request_url.split("=")[-1])
@@ -134,7 +138,6 @@ def send_req_slack_msg(channel_name, data_list):
     # Send the main msg and thread msg
     msg_response = slack_notification(channel=channel_name, msg_text=budget)
     respond_to_slack_message(channel=channel_name, text=thread_msg_text, thread_ts=msg_response)
-    devtracker_sleep(2, 4)
 
     # return the time-stamp to be saved in the GoogleSheet
     return str(msg_response)
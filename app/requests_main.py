@@ -1,35 +1,39 @@
 # coding: utf-8
 import logging
-import pandas as pd
 from tqdm import tqdm
 
 from import_secrets import *
-from functions import gs_update_data
+from functions import gs_write_buffer
 from functions import open_worksheet
 from functions import gs_get_data
-from functions import devtracker_sleep
+from functions import pacing_report
+from functions import page_load_report
 from functions import column_index_to_alphabet
-from functions import get_driver
-from functions import bubbleio_login
-from functions_slack import slack_notification
+from functions import sheet_row_numbers
+from functions import DriverPool
+from functions_supervisor import Supervisor
+from functions_store import store_sync
+from functions_store import store_get_df
 from requests_functions import get_rfp_request
 from requests_functions import send_req_slack_msg
 
 
-def requests_main_script(driver):
+def requests_main_script(driver_pool):
     # Creating a dataframe from Leads Sheet
     logging.info("[Script Log | Requests]: Opening New Requests Sheet")
     sh = open_worksheet(req_sheet_name)
-    req_sh_data = gs_get_data(sh)
-    req_sh_cols = req_sh_data[0]
-    req_df = pd.DataFrame(req_sh_data[1:], columns=req_sh_cols)
-
-    # Assign a range column to the DataFrame
-    req_df['Range'] = [f"A{i + 2}:{column_index_to_alphabet(len(req_df.columns))}{i + 2}" for i in range(len(req_df))]
+    gs_buffer = gs_write_buffer(sh, "Requests")
+    req_sh_data = gs_get_data(sh, delta=True)
+    store_sync(req_sheet_name, req_sh_data)
 
     # Filter out the rows for which the Slack Message has already been sent.
     logging.info("[Script Log | Requests]: Removing threads for which the message has already been sent.")
-    non_etl_df = req_df.loc[req_df['etl_status'] != 'Y']
+    non_etl_df = store_get_df(req_sheet_name, exclude={"etl_status": "Y"})
+
+    # Assign a range column to the DataFrame
+    last_col_letter = column_index_to_alphabet(len(non_etl_df.columns))
+    sheet_rows = sheet_row_numbers(non_etl_df)
+    non_etl_df['Range'] = "A" + sheet_rows + ":" + last_col_letter + sheet_rows
     logging.info(f"[Script Log | Requests]: Data to be Extracted, Rows, Columns: {non_etl_df.shape}")
 
     # Extracting Data for Non-ETL Requests
@@ -37,15 +41,17 @@ def requests_main_script(driver):
 
     if non_etl_df.shape[0]:
         try:
-            is_logged_in = bubbleio_login(driver)
+            is_logged_in = driver_pool.login()
             if is_logged_in:
-                for non_etl_row_vals in tqdm(non_etl_rows, desc="[Script Log | Requests]: Extracting New Requests"):
-                    # Get Email Request URL
-                    email_req_url = non_etl_row_vals[0]
-                    logging.info(f"[Script Log | Requests]: Now Extracting: {email_req_url}")
-
-                    # Get RFP_Request Data using Email Request URL
-                    rfp_req_results = get_rfp_request(email_req_url, driver)
+                # Get RFP_Request Data using Email Request URL, spread across the browser sessions
+                email_req_urls = [non_etl_row_vals[0] for non_etl_row_vals in non_etl_rows]
+                logging.info(f"[Script Log | Requests]: Extracting {len(email_req_urls)} Requests "
+                             f"on {driver_pool.size} Browser Session(s)")
+                rfp_req_results_all = driver_pool.imap(get_rfp_request, email_req_urls)
+                rows_progress = tqdm(zip(non_etl_rows, rfp_req_results_all), total=len(non_etl_rows),
+                                     desc="[Script Log | Requests]: Extracting New Requests")
+                for non_etl_row_vals, rfp_req_results in rows_progress:
+                    logging.info(f"[Script Log | Requests]: Extracted: {non_etl_row_vals[0]}")
                     logging.info(rfp_req_results)
 
                     # RFP ID
@@ -86,44 +92,27 @@ def requests_main_script(driver):
                         non_etl_row_vals[-2] = "Y"
                         # Update Google Sheets
                         row_index = non_etl_row_vals[-1]
-                        gs_update_data(sh, row_index, [non_etl_row_vals[:-1]])
-                        devtracker_sleep(1, 2)
+                        gs_buffer.update(row_index, [non_etl_row_vals[:-1]])
+            else:
+                logging.error("[Script Log | Requests]: Unable to log in to Bubble, Skipping...")
         except Exception as e:
             logging.critical(f"[Script Log | Requests]: Something went wrong: {e}", exc_info=True)
             raise Exception
+        finally:
+            # Write the extracted rows even if the iteration failed, so sent messages are flagged
+            gs_buffer.flush()
     else:
         logging.warning("[Script Log | Requests]: No New Requests Found")
+    pacing_report("[Script Log | Requests]")
+    page_load_report("[Script Log | Requests]")
     logging.info("[Script Log | Requests]: Iteration complete, Requests Script is Restarting...")
-    devtracker_sleep(10, 20)
 
 
 def exec_req_main_script():
-    logging.info("[Script Log | Requests]: Starting RFP Request Tracker Tool")
-    slack_notification(channel=alerts_channel_name,
-                       msg_text=":incoming_envelope: RFP Requests Script Started! :rocket:")
-    driver = get_driver()
-
-    while True:
-        try:
-            requests_main_script(driver)
-        except Exception as e:
-            logging.critical(f"[Script Log | Requests]: RFP Request Tracker is Down,  Error:", exc_info=True)
-            slack_notification(channel=alerts_channel_name,
-                               msg_text=":incoming_envelope: :x: RFP Request Tracker is Down :x:",
-                               exception_trace=e)
-            break
-
-    # Quiting Driver & Restarting
-    try:
-        driver.quit()
-        logging.info(f"[Script Log | Requests]: Closing Driver")
-    except Exception as e:
-        logging.warning(f"[Script Log | Requests]: Driver is already closed {e}")
-
-    devtracker_sleep(30, 60)
-    slack_notification(channel=alerts_channel_name,
-                       msg_text=":incoming_envelope: :recycle: Restarting RFP Requests Tracker :recycle:")
-    exec_req_main_script()
+    # Each (re)start gets a fresh pool of browser sessions, quit when the run ends
+    Supervisor(label=":incoming_envelope: RFP Requests Tracker", log_prefix="[Script Log | Requests]",
+               iteration=requests_main_script, interval=requests_interval,
+               setup=DriverPool, teardown=lambda driver_pool: driver_pool.quit(), script="requests").run()
 
 
 if __name__ == '__main__':
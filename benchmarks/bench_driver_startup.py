@@ -0,0 +1,54 @@
+# coding: utf-8
+"""
+Browser cold start: chromedriver resolution, browser launch and time-to-first-page,
+for the "normal" and "eager" page load strategies.
+
+Usage:
+    python benchmarks/bench_driver_startup.py [url] [runs]
+"""
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from functions import get_driver  # noqa: E402
+from functions import resolve_chromedriver  # noqa: E402
+from functions import chromedriver_resolved  # noqa: E402
+
+
+def timed(func, *args):
+    start = perf_counter()
+    result = func(*args)
+    return perf_counter() - start, result
+
+
+def cold_start(url, load_strategy):
+    """
+    Returns (launch seconds, first page seconds) of a new browser session.
+    """
+    launch_time, driver = timed(get_driver, load_strategy)
+    try:
+        page_time, _ = timed(driver.get, url)
+    finally:
+        driver.quit()
+    return launch_time, page_time
+
+
+if __name__ == '__main__':
+    url = sys.argv[1] if len(sys.argv) > 1 else "https://bubble.io/"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    chromedriver_resolved.clear()
+    resolve_time, path = timed(resolve_chromedriver)
+    print(f"Chromedriver: {path}")
+    print(f"Resolve (first call of the process, from the cache file if present): {resolve_time:.3f}s")
+    resolve_time, _ = timed(resolve_chromedriver)
+    print(f"Resolve (memoized): {resolve_time * 1000:.3f}ms")
+
+    for load_strategy in ("normal", "eager"):
+        results = [cold_start(url, load_strategy) for _ in range(runs)]
+        launch = sum(launch_time for launch_time, _ in results) / runs
+        first_page = sum(page_time for _, page_time in results) / runs
+        print(f"[{load_strategy}] Launch: {launch:.2f}s | First Page: {first_page:.2f}s | "
+              f"Time-to-First-Page: {launch + first_page:.2f}s (mean of {runs})")
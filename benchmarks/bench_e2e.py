@@ -0,0 +1,237 @@
+# coding: utf-8
+"""
+One iteration of each tracker end to end, offline: requests_main_script, the Bids tracker (get_io_bids) and
+the response notifier, against local stand-ins of bubble.io, Google Sheets and Slack (e2e_standins.py).
+
+Each backlog size runs in its own process (fresh caches, store & browser) with that many new requests,
+new bids and unsent leads. Every stage is run twice, with the backlog then idle (nothing new), and
+reports its latency and the calls made to each service.
+
+Usage:
+    python benchmarks/bench_e2e.py [--sizes 10,100] [--stages requests,bids,notifier]
+                                   [--pool-size 1] [--bubble-latency 0] [--sheets-latency 0]
+                                   [--slack-latency 0] [--paced]
+
+The Requests & Bids stages start a headless Chrome (get_driver), so they need Chrome and the app's
+requirements; the notifier stage needs the requirements only. Pacing (BUBBLE_PACE, SHEETS_PACE and the
+Slack method intervals) is turned off unless --paced is given, latencies are seconds per call.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from time import perf_counter
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from e2e_standins import BubbleServer  # noqa: E402
+from e2e_standins import SlackServer  # noqa: E402
+from e2e_standins import FakeWorksheet  # noqa: E402
+from e2e_standins import request_fields  # noqa: E402
+from e2e_standins import bid_fields  # noqa: E402
+
+req_columns = ["email_req_url", "rfp_id", "client_first_name", "proj_title", "tags", "pricing", "timestamp",
+               "description", "request_url", "requests_thread_id", "req_type", "etl_status"]
+leads_columns = ["rfp_id", "agency", "service", "location", "budget", "created_date", "requests_url",
+                 "requests_thread_id", "req_type", "response_date", "response", "rep_name",
+                 "response_msg_status", "response_thread_id"]
+slack_channels = {"rfp-alerts": "C0ALERTS", "rfp-leads": "C0LEADS", "rfp-direct": "C0DIRECT",
+                  "rfp-response-time": "C0RESPONSE"}
+request_types = ["Agency Request", "Direct Request"]
+
+
+def seed_worksheets(size, bubble):
+    """
+    Requests, Bids & Leads worksheets holding a backlog of `size` new requests & unsent leads.
+    The Bids sheet holds the one bid already scraped, the Sent bids page lists it after the new ones.
+    """
+    req_rows = [req_columns] + [
+        [f"{bubble.url}agency-requests/inbox?rfp={rfp_id}", "", "", "", "", "", "05/03/2024, 15:45:00",
+         "", "", "", request_types[i % 2], ""]
+        for i, rfp_id in enumerate(bubble.requests)]
+    bid_rows = [["100000", "Marketplace MVP #0", "06/03/2024, 10:15:00", "Already scraped", "",
+                 "MATT GRAHAM", ""]]
+    lead_rows = [leads_columns] + [
+        [str(400000 + i), "Rapid Dev", "Web App", "Remote", "$5,000", "05/03/2024, 15:45:00", "",
+         f"{1600000000 + i}.000200", request_types[i % 2], "06/03/2024, 10:15:00", "Response body",
+         "MATT GRAHAM", "", ""]
+        for i in range(size)]
+    return {
+        "Requests": FakeWorksheet(1, "Requests", req_rows),
+        "Bids": FakeWorksheet(2, "Bids", bid_rows),
+        "Leads": FakeWorksheet(3, "Leads", lead_rows),
+    }
+
+
+def stage_calls(worksheets, slack, bubble):
+    sheets_calls = Counter()
+    for sh in worksheets.values():
+        sheets_calls.update(sh.calls)
+    return {"sheets": sheets_calls, "slack": Counter(slack.calls), "bubble": Counter(bubble.calls)}
+
+
+def measure(stage, func, worksheets, slack, bubble, done):
+    """
+    Run a stage and return its latency, the calls it made per service & method and its `done()` count.
+    """
+    before = stage_calls(worksheets, slack, bubble)
+    start = perf_counter()
+    error = ""
+    try:
+        func()
+    except Exception as e:
+        error = repr(e)
+    seconds = perf_counter() - start
+    after = stage_calls(worksheets, slack, bubble)
+    calls = {service: dict(after[service] - before[service]) for service in after}
+    return {"stage": stage, "seconds": seconds, "calls": calls, "done": done(), "error": error}
+
+
+def run_backlog(args):
+    """
+    Child process: one iteration of each stage for a backlog of `args.size`, results written to `args.result`.
+    """
+    size = args.size
+    # The bid already in the Bids sheet is listed after the new ones
+    bids = {str(300000 + i): bid_fields(i) for i in range(size)}
+    bids["100000"] = bid_fields(0)
+    bubble = BubbleServer(requests={str(200000 + i): request_fields(200000 + i) for i in range(size)},
+                          bids=bids, latency=args.bubble_latency)
+    slack = SlackServer(slack_channels, latency=args.slack_latency)
+    for i in range(size):
+        slack.seed("rfp-leads" if i % 2 == 0 else "rfp-direct", f"{1600000000 + i}.000200")
+
+    os.environ.setdefault("CHROMEDRIVER_CACHE_PATH", os.path.join(args.work_dir, "chromedriver_cache.json"))
+    os.environ.update({
+        "BUBBLE_BASE_URL": bubble.url,
+        "SLACK_API_URL": f"{slack.url}api/",
+        "SLACK_APP_SECRET": "xoxb-bench",
+        "ALERTS_SLACK_CH_NAME": "rfp-alerts",
+        "AGENCY_REQS_SLACK_CH_NAME": "rfp-leads",
+        "DIRECT_REQS_SLACK_CH_NAME": "rfp-direct",
+        "RESPONSE_SLACK_CH_NAME": "rfp-response-time",
+        "SPREADSHEET_ID": "bench",
+        "REQ_SHEET_NAME": "Requests",
+        "BID_SHEET_NAME": "Bids",
+        "LEADS_SHEET_NAME": "Leads",
+        "STATE_DB_PATH": os.path.join(args.work_dir, "tracker_state.db"),
+        "BUBBLE_SESSION_PATH": os.path.join(args.work_dir, "bubble_session.json"),
+        "DRIVER_POOL_SIZE": str(args.pool_size),
+    })
+    if not args.paced:
+        os.environ.update({"BUBBLE_PACE": "0,0", "SHEETS_PACE": "0,0"})
+    # import_secrets reads ../.env.prod from the working directory, keep it out of reach
+    os.chdir(args.work_dir)
+
+    from functions import gs_worksheets
+    from functions import DriverPool
+    from functions_slack import slack_dispatcher
+    from import_secrets import slack_method_intervals
+    from requests_main import requests_main_script
+    from bids_main import bids_pool_iteration
+    from bids_slack_notifier import run_resp_slack_notifier
+
+    if not args.paced:
+        for method in slack_method_intervals:
+            slack_method_intervals[method] = 0.0
+    worksheets = seed_worksheets(size, bubble)
+    for sh in worksheets.values():
+        sh.latency = args.sheets_latency
+    gs_worksheets.update(worksheets)
+
+    def flagged(sheet_name, column, value="Y"):
+        rows = worksheets[sheet_name].rows
+        col_index = rows[0].index(column)
+        return sum(1 for row in rows[1:] if len(row) > col_index and row[col_index] == value)
+
+    def run_notifier():
+        run_resp_slack_notifier()
+        # Thread replies & reactions are sent in the background by the sync notifier
+        slack_dispatcher.drain()
+
+    stages = {
+        "requests": (lambda: requests_main_script(driver_pool), lambda: flagged("Requests", "etl_status")),
+        "bids": (lambda: bids_pool_iteration(driver_pool), lambda: len(worksheets["Bids"].rows) - 1),
+        "notifier": (run_notifier, lambda: flagged("Leads", "response_msg_status")),
+    }
+    results = []
+    driver_pool = None
+    try:
+        if {"requests", "bids"} & set(args.stages):
+            driver_pool = DriverPool(size=args.pool_size)
+            results.append(measure("browser & login", driver_pool.login, worksheets, slack, bubble,
+                                   lambda: ""))
+        for stage in args.stages:
+            func, done = stages[stage]
+            results.append(measure(stage, func, worksheets, slack, bubble, done))
+            results.append(measure(f"{stage} (idle)", func, worksheets, slack, bubble, done))
+    finally:
+        if driver_pool:
+            driver_pool.quit()
+        bubble.close()
+        slack.close()
+    with open(args.result, "w") as result_file:
+        json.dump(results, result_file)
+
+
+def calls_summary(calls):
+    return ", ".join(f"{method} {count}" for method, count in sorted(calls.items())) or "-"
+
+
+def report(size, results):
+    print(f"\nBacklog: {size}")
+    print(f"{'Stage':<18}{'Seconds':>9}{'Done':>7}  {'Sheets':<34}{'Slack':<52}{'Bubble'}")
+    for result in results:
+        calls = result["calls"]
+        print(f"{result['stage']:<18}{result['seconds']:>9.2f}{result['done']:>7}  "
+              f"{calls_summary(calls['sheets']):<34}{calls_summary(calls['slack']):<52}"
+              f"{calls_summary(calls['bubble'])}")
+        if result["error"]:
+            print(f"{'':<18}Failed: {result['error']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--sizes", default="10,100", help="Comma-separated backlog sizes")
+    parser.add_argument("--stages", default="requests,bids,notifier", help="Comma-separated stages to run")
+    parser.add_argument("--pool-size", type=int, default=1, help="DRIVER_POOL_SIZE")
+    parser.add_argument("--bubble-latency", type=float, default=0.0, help="Seconds added to each page served")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="Seconds added to each Sheets call")
+    parser.add_argument("--slack-latency", type=float, default=0.0, help="Seconds added to each Slack call")
+    parser.add_argument("--paced", action="store_true", help="Keep the configured pacing between calls")
+    # Set by the parent process for each backlog size
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.size is not None:
+        run_backlog(args)
+        sys.exit(0)
+
+    for size in [int(size) for size in args.sizes.split(",")]:
+        work_dir = tempfile.mkdtemp(prefix=f"bench_e2e_{size}_")
+        result_path = os.path.join(work_dir, "results.json")
+        log_path = os.path.join(work_dir, "bench.log")
+        command = [sys.executable, os.path.abspath(__file__), "--size", str(size), "--work-dir", work_dir,
+                   "--result", result_path, "--stages", ",".join(args.stages),
+                   "--pool-size", str(args.pool_size), "--bubble-latency", str(args.bubble_latency),
+                   "--sheets-latency", str(args.sheets_latency), "--slack-latency", str(args.slack_latency)]
+        if args.paced:
+            command.append("--paced")
+        with open(log_path, "w") as log_file:
+            completed = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT)
+        if completed.returncode or not os.path.exists(result_path):
+            print(f"\nBacklog: {size} failed (exit code {completed.returncode}), see {log_path}")
+            continue
+        with open(result_path) as result_file:
+            report(size, json.load(result_file))
+        print(f"Logs: {log_path}")
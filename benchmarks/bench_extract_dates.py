@@ -0,0 +1,69 @@
+# coding: utf-8
+"""
+extract_dates date lookup: datefinder on every call (before) vs the Bubble fast path and the
+memoized find_date, over the strings recorded in date_corpus.txt by record_date_corpus.py. Also checks
+that find_date gives the same date as datefinder for every string.
+
+Usage:
+    python benchmarks/bench_extract_dates.py [repeats]
+"""
+import os
+import sys
+from time import perf_counter
+
+import datefinder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from functions import find_date  # noqa: E402
+from functions import parse_bubble_date  # noqa: E402
+
+corpus_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "date_corpus.txt")
+
+
+def datefinder_date(data_str):
+    """
+    The previous lookup: every datefinder match, then the first one.
+    """
+    matches = list(datefinder.find_dates(data_str))
+    return (matches[0].day, matches[0].month, matches[0].year) if matches else None
+
+
+def timed(func, texts, repeats):
+    start = perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            func(text)
+    return (perf_counter() - start) / (repeats * len(texts))
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with open(corpus_path) as corpus_file:
+        texts = [line.rstrip("\n") for line in corpus_file if line.strip() and not line.startswith("#")]
+    if not texts:
+        sys.exit(f"No date texts in {corpus_path}, "
+                 f"record them first: python benchmarks/record_date_corpus.py")
+
+    mismatches = []
+    for text in texts:
+        expected, found = datefinder_date(text), find_date(text)
+        if expected != found:
+            mismatches.append((text, expected, found))
+        path = "fast path" if parse_bubble_date(text) else "datefinder"
+        print(f"{text!r:45} -> {found} ({path})")
+    fast_path_hits = sum(1 for text in texts if parse_bubble_date(text))
+    print(f"\nStrings: {len(texts)} | Fast Path: {fast_path_hits} | Mismatches: {len(mismatches)}")
+    for text, expected, found in mismatches:
+        print(f"  MISMATCH {text!r}: datefinder {expected}, find_date {found}")
+
+    datefinder_time = timed(datefinder_date, texts, repeats)
+    find_date.cache_clear()
+    uncached_time = timed(find_date.__wrapped__, texts, repeats)
+    cached_time = timed(find_date, texts, repeats)
+    print(f"datefinder (before):  {datefinder_time * 1e6:8.1f} us/string")
+    print(f"find_date uncached:   {uncached_time * 1e6:8.1f} us/string "
+          f"({datefinder_time / uncached_time:.1f}x)")
+    print(f"find_date memoized:   {cached_time * 1e6:8.1f} us/string ({datefinder_time / cached_time:.1f}x)")
+    print(find_date.cache_info())
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,89 @@
+# coding: utf-8
+"""
+Lead preparation at 100k rows: the per-row strptime loop the notifier used vs prepare_leads.
+
+Usage:
+    python benchmarks/bench_prepare_leads.py [rows]
+"""
+import os
+import sys
+import random
+from time import perf_counter
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from functions import column_index_to_alphabet  # noqa: E402
+from functions import prepare_leads  # noqa: E402
+
+leads_columns = ["rfp_id", "agency", "service", "location", "budget", "created_date", "requests_url",
+                 "requests_thread_id", "req_type", "response_date", "response", "rep_name",
+                 "response_msg_status", "response_thread_id"]
+
+
+def synthetic_leads(rows):
+    date_format = "%d/%m/%Y, %H:%M:%S"
+    start = datetime(2024, 1, 1)
+    data = []
+    for i in range(rows):
+        created = start + timedelta(seconds=random.randint(0, 10_000_000))
+        responded = created + timedelta(seconds=random.randint(60, 500_000))
+        data.append([str(100000 + i), "Agency", "SEO", "Remote", "$1,000", created.strftime(date_format),
+                     "", f"{1700000000 + i}.000100", random.choice(["Agency Request", "Direct Request"]),
+                     responded.strftime(date_format), "Response body", "Rep", "", ""])
+    return pd.DataFrame(data, columns=leads_columns)
+
+
+def prepare_leads_loop(leads_df):
+    """
+    The notifier's previous preparation: A1 addresses column by column, then strptime per row.
+    """
+    leads_df = leads_df.copy()
+    columns = list(leads_df.columns)
+    for column in ["response_msg_status", "response_thread_id"]:
+        col_letter = column_index_to_alphabet(columns.index(column) + 1)
+        leads_df[f"{column}_range"] = [f"{col_letter}{i + 2}" for i in leads_df.index]
+    leads = []
+    for row in leads_df.values.tolist():
+        created_date_time = datetime.strptime(row[5], "%d/%m/%Y, %H:%M:%S")
+        response_date_time = datetime.strptime(row[9], "%d/%m/%Y, %H:%M:%S")
+        leads.append({
+            "url": f"https://bubble.io/agency-requests/sent?rfp={row[0]}",
+            "budget": row[4],
+            "req_thread_ts": row[7],
+            "req_type": row[8],
+            "response_body": row[10],
+            "rep_name": row[11],
+            "total_response_time": str(response_date_time - created_date_time),
+            "req_channel_name": "rfp-leads" if row[8] == "Agency Request" else "rfp-direct",
+            "flag_cell_address": row[-2],
+            "response_th_cell_address": row[-1],
+        })
+    return leads
+
+
+def timed(func, *args):
+    start = perf_counter()
+    result = func(*args)
+    return perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(0)
+    leads_df = synthetic_leads(rows)
+
+    loop_time, loop_leads = timed(prepare_leads_loop, leads_df)
+    vector_time, vector_leads = timed(
+        lambda df: prepare_leads(df, {"Agency Request": "rfp-leads"}, "rfp-direct")[0], leads_df
+    )
+
+    assert [lead["total_response_time"] for lead in loop_leads] == \
+        [lead.total_response_time for lead in vector_leads]
+    assert [lead["flag_cell_address"] for lead in loop_leads] == \
+        [lead.flag_cell_address for lead in vector_leads]
+    print(f"Rows: {rows}")
+    print(f"Per-row loop:   {loop_time:.3f}s")
+    print(f"prepare_leads:  {vector_time:.3f}s ({loop_time / vector_time:.1f}x)")
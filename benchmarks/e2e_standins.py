@@ -0,0 +1,285 @@
+# coding: utf-8
+"""
+Local stand-ins for the services the trackers talk to, used by bench_e2e.py:
+
+- BubbleServer: HTTP server rendering the fixture pages (fixtures/) for a backlog of requests & bids.
+- FakeWorksheet: in-memory gspread Worksheet with the calls the trackers make.
+- SlackServer: HTTP server answering the Slack Web API methods the trackers call.
+
+Each counts the calls it receives and can add a fixed latency per call.
+"""
+import os
+import json
+import threading
+from time import sleep
+from string import Template
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from gspread.utils import a1_to_rowcol
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Ways a bid names its rep, one per get_rep_name path: signature, directory, page (profile link), none
+bid_responses = [
+    "Hi there,<br><br>We have built several apps like this one and can start next week.<br><br>"
+    "MATT GRAHAM&nbsp;&nbsp;|&nbsp;&nbsp;RAPID DEV",
+    "Hello,<br><br>Happy to jump on a call to scope the MVP.<br><br>Best,<br>Andrew Woodard",
+    "Hi,<br><br>Please find our portfolio below.<br><br><u>Rapid Dev Contributor Profile | Bubble</u>",
+    "Hi,<br><br>Thanks for reaching out, we would love to help with this project.",
+]
+
+
+def load_fixture(name):
+    with open(os.path.join(fixtures_dir, name), encoding="utf-8") as fixture_file:
+        return Template(fixture_file.read())
+
+
+class StandInServer:
+    """
+    ThreadingHTTPServer on a free local port, served from a daemon thread.
+    Subclasses implement `handle(handler, path, params, body)` -> (status, content type, body bytes).
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.calls_lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.respond(b"")
+
+            def do_POST(self):
+                self.respond(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+
+            def respond(self, body):
+                if server.latency:
+                    sleep(server.latency)
+                url = urlsplit(self.path)
+                params = dict(parse_qsl(url.query))
+                status, content_type, content, headers = server.handle(self, url.path, params, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def count(self, name):
+        with self.calls_lock:
+            self.calls[name] += 1
+
+    def handle(self, handler, path, params, body):
+        raise NotImplementedError
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class BubbleServer(StandInServer):
+    """
+    bubble.io stand-in: home page (logged in), request pages, the Sent bids page & the bid pages.
+
+    Args:
+        requests (dict): {rfp_id: request page fields}, see request_fields.
+        bids (dict): {rfp_id: bid page fields}, see bid_fields, listed on the Sent bids page in order.
+    """
+
+    session_cookie = "meta_u1main"
+
+    def __init__(self, requests, bids, latency=0.0):
+        self.requests = requests
+        self.bids = bids
+        self.templates = {name: load_fixture(f"{name}.html")
+                          for name in ("index", "request", "bids", "bid_container", "bid")}
+        super().__init__(latency)
+
+    def handle(self, handler, path, params, body):
+        headers = [("Set-Cookie", f"{self.session_cookie}=bench-session; Path=/; Max-Age=86400")]
+        rfp_id = params.get("rfp")
+        if path == "/":
+            self.count("home")
+            page = self.templates["index"].substitute()
+        elif path == "/agency-requests/sent" and rfp_id in self.bids:
+            self.count("bid")
+            page = self.templates["bid"].substitute(rfp_id=rfp_id, **self.bids[rfp_id])
+        elif path == "/agency-requests/sent":
+            self.count("bids")
+            container = self.templates["bid_container"]
+            containers = "\n".join(container.substitute(rfp_id=bid_rfp_id, name=bid["name"])
+                                   for bid_rfp_id, bid in self.bids.items())
+            page = self.templates["bids"].substitute(bids_count=len(self.bids), bid_containers=containers)
+        elif path.startswith("/agency-requests/") and rfp_id in self.requests:
+            self.count("request")
+            page = self.templates["request"].substitute(rfp_id=rfp_id, **self.requests[rfp_id])
+        else:
+            self.count("not_found")
+            return 404, "text/html", b"<html><body>Not found</body></html>", headers
+        return 200, "text/html; charset=utf-8", page.encode("utf-8"), headers
+
+
+def request_fields(rfp_id):
+    """
+    Fields of a synthetic request page.
+    """
+    return {
+        "proj_title": f"Marketplace MVP #{rfp_id}",
+        "client_first_name": "Jordan",
+        "tags": "Marketplace, Payments, Web App",
+        "pricing": "$5,000 - $10,000",
+        "req_created_date": "Mar 5, 2024 3:45 pm",
+        "description": "We are looking for an agency to build a two-sided marketplace on Bubble. " * 20,
+    }
+
+
+def bid_fields(index):
+    """
+    Fields of a synthetic bid page, cycling through the ways a response names its rep.
+    """
+    return {
+        "name": f"Marketplace MVP #{index}",
+        "response_date": "Mar 6, 2024 10:15 am",
+        "response": bid_responses[index % len(bid_responses)],
+    }
+
+
+class FakeWorksheet:
+    """
+    In-memory gspread Worksheet: get_all_values, get_values, append_rows, update & batch_update,
+    with the `id` & `title` the trackers key their caches on. `calls` counts the API calls by method.
+    """
+
+    def __init__(self, sheet_id, title, rows, latency=0.0):
+        self.id = sheet_id
+        self.title = title
+        self.rows = [[str(value) for value in row] for row in rows]
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def api_call(self, method):
+        self.calls[method] += 1
+        if self.latency:
+            sleep(self.latency)
+
+    def get_all_values(self):
+        with self.lock:
+            self.api_call("get_all_values")
+            return [list(row) for row in self.rows]
+
+    def get_values(self, range_name):
+        with self.lock:
+            self.api_call("get_values")
+            row_num, col_num = a1_to_rowcol(range_name.split(":")[0])
+            return [list(row[col_num - 1:]) for row in self.rows[row_num - 1:]]
+
+    def append_rows(self, values, value_input_option=None, table_range=None):
+        with self.lock:
+            self.api_call("append_rows")
+            self.rows.extend([["" if value is None else str(value) for value in row] for row in values])
+
+    def write_range(self, range_name, values):
+        row_num, col_num = a1_to_rowcol(range_name.split(":")[0])
+        for row_offset, row_values in enumerate(values):
+            while len(self.rows) < row_num + row_offset:
+                self.rows.append([])
+            row = self.rows[row_num - 1 + row_offset]
+            for col_offset, value in enumerate(row_values):
+                col_index = col_num - 1 + col_offset
+                if col_index >= len(row):
+                    row.extend([""] * (col_index + 1 - len(row)))
+                row[col_index] = "" if value is None else str(value)
+
+    def update(self, range_name, values=None, value_input_option=None):
+        with self.lock:
+            self.api_call("update")
+            self.write_range(range_name, values if isinstance(values, list) else [[values]])
+
+    def batch_update(self, data, value_input_option=None):
+        with self.lock:
+            self.api_call("batch_update")
+            for update in data:
+                self.write_range(update["range"], update["values"])
+
+
+class SlackServer(StandInServer):
+    """
+    Slack Web API stand-in: chat.postMessage, chat.update, reactions.add, conversations.list
+    & conversations.history.
+
+    Messages are kept per channel (by name or ID as the caller sent it) so conversations.history
+    can resolve thread timestamps. `seed(channel, ts)` adds a message posted before the run.
+    """
+
+    def __init__(self, channels, latency=0.0):
+        # {channel name: channel ID}
+        self.channels = channels
+        self.messages = {}
+        self.next_ts = 1700000000
+        self.messages_lock = threading.Lock()
+        super().__init__(latency)
+
+    def seed(self, channel, ts):
+        self.messages.setdefault(channel, set()).add(ts)
+
+    def post(self, channel):
+        with self.messages_lock:
+            self.next_ts += 1
+            ts = f"{self.next_ts}.000100"
+            self.messages.setdefault(channel, set()).add(ts)
+        return ts
+
+    def history(self, channel, params):
+        names = [name for name, channel_id in self.channels.items() if channel_id == channel]
+        timestamps = set(self.messages.get(channel, set()))
+        for name in names:
+            timestamps |= self.messages.get(name, set())
+        oldest = float(params.get("oldest") or 0)
+        latest = float(params.get("latest") or "inf")
+        timestamps = sorted((ts for ts in timestamps if oldest <= float(ts) <= latest), key=float,
+                            reverse=True)
+        limit = int(params.get("limit") or 100)
+        offset = int(params.get("cursor") or 0)
+        page = timestamps[offset:offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(timestamps) else ""
+        return {"messages": [{"type": "message", "ts": ts} for ts in page],
+                "has_more": bool(next_cursor), "response_metadata": {"next_cursor": next_cursor}}
+
+    def handle(self, handler, path, params, body):
+        method = path.rsplit("/", 1)[-1]
+        if body:
+            if handler.headers.get("Content-Type", "").startswith("application/json"):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body.decode("utf-8")))
+        self.count(method)
+        if method == "chat.postMessage":
+            ts = self.post(params["channel"])
+            result = {"channel": params["channel"], "ts": ts,
+                      "message": {"text": params.get("text"), "ts": ts}}
+        elif method == "chat.update":
+            result = {"channel": params["channel"], "ts": params["ts"], "text": params.get("text")}
+        elif method == "reactions.add":
+            result = {}
+        elif method == "conversations.list":
+            channels = [{"id": channel_id, "name": name} for name, channel_id in self.channels.items()]
+            result = {"channels": channels, "response_metadata": {"next_cursor": ""}}
+        elif method == "conversations.history":
+            result = self.history(params["channel"], params)
+        else:
+            return 200, "application/json", json.dumps({"ok": False, "error": "unknown_method"}).encode(), []
+        return 200, "application/json", json.dumps({"ok": True, **result}).encode(), []
@@ -0,0 +1,92 @@
+# coding: utf-8
+"""
+Record the date texts of live Bubble pages into date_corpus.txt, for bench_extract_dates.py.
+
+Logs in with the app's settings (.env), opens the request pages listed in the Requests sheet and
+the bid pages listed in the Bids sheet, and appends each `req_created_date` / `response_date` text
+exactly as the page shows it, before any parsing. Texts already in the corpus are skipped.
+
+Usage:
+    python benchmarks/record_date_corpus.py [--limit 50]
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from selenium.webdriver.common.by import By  # noqa: E402
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+from selenium.webdriver.support import expected_conditions as EC  # noqa: E402
+
+from functions import get_driver  # noqa: E402
+from functions import bubbleio_login  # noqa: E402
+from functions import open_worksheet  # noqa: E402
+from functions import gs_get_data  # noqa: E402
+from functions import extract_page_fields  # noqa: E402
+from functions import wait_for  # noqa: E402
+from page_selectors import request_page_fields  # noqa: E402
+from page_selectors import bid_page_fields  # noqa: E402
+from import_secrets import *  # noqa: E402
+
+corpus_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "date_corpus.txt")
+# (sheet, URL column, date field, selectors) of the pages to record, the Requests sheet has a header row
+recorded_pages = [
+    (req_sheet_name, 8, "req_created_date", request_page_fields),
+    (bid_sheet_name, 4, "response_date", bid_page_fields),
+]
+
+
+def sheet_urls(sheet_name, column, limit):
+    """
+    The last `limit` page URLs of a worksheet column, newest first.
+    """
+    rows = gs_get_data(open_worksheet(sheet_name))
+    urls = [row[column] for row in rows if len(row) > column and row[column].startswith("http")]
+    return urls[::-1][:limit]
+
+
+def record_date_text(driver, url, date_field, fields):
+    """
+    The date text of a page as shown, "" if the page didn't render it.
+    """
+    driver.get(url)
+    try:
+        wait_for(driver, EC.visibility_of_element_located((By.XPATH, fields[date_field])),
+                 site="record_date_text")
+        values, _ = extract_page_fields(driver, {date_field: fields[date_field]})
+    except WebDriverException as e:
+        print(f"  {url}: {type(e).__name__}")
+        return ""
+    return (values.get(date_field) or "").strip()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--limit", type=int, default=50, help="Pages per sheet")
+    args = parser.parse_args()
+
+    with open(corpus_path) as corpus_file:
+        known_texts = {line.rstrip("\n") for line in corpus_file if line.strip() and not line.startswith("#")}
+
+    driver = get_driver()
+    recorded = []
+    try:
+        if not bubbleio_login(driver):
+            sys.exit("Unable to log in to Bubble")
+        for sheet_name, column, date_field, fields in recorded_pages:
+            for url in sheet_urls(sheet_name, column, args.limit):
+                text = record_date_text(driver, url, date_field, fields)
+                if text and text not in known_texts:
+                    known_texts.add(text)
+                    recorded.append((date_field, text))
+                    print(f"  {date_field}: {text!r}")
+    finally:
+        driver.quit()
+
+    if recorded:
+        with open(corpus_path, "a") as corpus_file:
+            corpus_file.write(f"# Recorded {datetime.now():%Y-%m-%d}\n")
+            corpus_file.writelines(f"{text}\n" for _date_field, text in recorded)
+    print(f"Recorded {len(recorded)} new date texts into {corpus_path}")